@@ -0,0 +1,185 @@
+"""
+Loads scraped statements into a typed DataFrame and answers multi-column queries on it.
+
+Dates become datetimes, day counts nullable integers and the metadata that repeats on every
+statement of a document becomes categorical, so a large dataset stays compact and can be
+filtered by range, e.g.
+
+    period_end in FY25 AND days_supervised > 300 AND Category = LEADING PEOPLE
+"""
+import os
+import re
+import csv
+import json
+import sqlite3
+import operator
+import numpy as np
+import pandas as pd
+
+from EPBScraper import CSV_HEADER, MONTHS, SQLITE_EXTENSIONS
+
+DATE_FORMAT = "%d %b %y"
+DATE_COLUMNS = ["period_start", "period_end", "ratee_signed", "rater_signed", "HLR_signed"]
+COUNT_COLUMNS = ["days_supervised", "days_non_rated"]
+# Everything but the statement itself repeats across the statements of a document, or across documents
+CATEGORICAL_COLUMNS = [column for column in CSV_HEADER
+                       if column not in DATE_COLUMNS + COUNT_COLUMNS + ["Statement"]]
+
+def typed_frame(df):
+    """Returns df with the date, count and categorical columns converted, leaving others as they are."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column in DATE_COLUMNS and not pd.api.types.is_datetime64_any_dtype(series):
+            df[column] = pd.to_datetime(series, format=DATE_FORMAT, errors="coerce")
+        elif column in COUNT_COLUMNS and not isinstance(series.dtype, pd.Int64Dtype):
+            df[column] = pd.to_numeric(series, errors="coerce").astype("Int64")
+        elif column in CATEGORICAL_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            df[column] = series.astype("category")
+    return df
+
+def load_dataset(source):
+    """Reads a CSV or SQLite output into a typed DataFrame."""
+    if source.lower().endswith(SQLITE_EXTENSIONS):
+        connection = sqlite3.connect(source)
+        try:
+            df = pd.read_sql_query("SELECT * FROM statements_flat", connection)
+        finally:
+            connection.close()
+    else:
+        df = pd.read_csv(source, dtype={column: "category" for column in CATEGORICAL_COLUMNS})
+    return typed_frame(df)
+
+def sortable_date(column):
+    """Returns an SQL expression that turns a 'D Mmm YY' text column into 'YYYYMMDD', which sorts chronologically."""
+    months = " ".join(f"WHEN '{name}' THEN '{number:02d}'" for name, number in MONTHS.items())
+    return (f"(CASE WHEN substr({column}, -2) >= '69' THEN '19' ELSE '20' END || substr({column}, -2) "
+            f"|| CASE lower(substr({column}, -6, 3)) {months} END || printf('%02d', CAST({column} AS INTEGER)))")
+
+def display_strings(series):
+    """Returns the values of series as the strings shown in the table, "" for missing values."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Written back in the EPB's own "5 Jan 25" form, without a leading zero on the day
+        text = series.dt.day.astype("Int64").astype(str) + series.dt.strftime(" %b %y")
+        return text.where(series.notna(), "").tolist()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Every row of a category shares one string object
+        categories = np.append(series.cat.categories.astype(str).to_numpy(dtype=object), "")
+        return categories[series.cat.codes.to_numpy()].tolist()
+    return series.astype(object).where(series.notna(), "").astype(str).tolist()
+
+CLAUSE_SEPARATOR = re.compile(r"\s+AND\s+")
+CLAUSE = re.compile(r"^\s*(\w+)\s*(?:(>=|<=|!=|=|>|<|~)|\s(in)\s)\s*(.*?)\s*$", re.IGNORECASE)
+COMPARISONS = {
+    "=": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+FISCAL_YEAR = re.compile(r"^FY\s*(\d{2}|\d{4})$", re.IGNORECASE)
+
+def fiscal_year(text):
+    """Returns the first and last day of a fiscal year such as FY25, which runs 1 Oct 24 to 30 Sep 25."""
+    match = FISCAL_YEAR.match(text)
+    if not match:
+        raise ValueError(f"Expected a fiscal year like FY25, got '{text}'")
+    year = int(match.group(1))
+    if year < 100:
+        year += 2000
+    return pd.Timestamp(year - 1, 10, 1), pd.Timestamp(year, 9, 30)
+
+def parse_date_value(text):
+    for date_format in (DATE_FORMAT, "%Y-%m-%d"):
+        try:
+            return pd.to_datetime(text, format=date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Expected a date like 5 Jan 25, got '{text}'")
+
+def text_mask(series, predicate):
+    """Applies predicate, a vectorized test on string values, to a text or categorical column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Only the distinct values are tested; codes of -1 (missing) pick the trailing False
+        matched = np.append(np.asarray(predicate(series.cat.categories.astype(str).to_series()), dtype=bool), False)
+        return matched[series.cat.codes.to_numpy()]
+    return np.asarray(predicate(series.fillna("").astype(str)), dtype=bool)
+
+def clause_mask(df, clause):
+    """
+    Returns the boolean mask of the rows of df that satisfy one "column operator value" clause.
+    A row whose value in the column is missing never matches, whatever the operator, != included.
+    """
+    match = CLAUSE.match(clause)
+    if not match:
+        raise ValueError(f"Could not read '{clause}', expected e.g. 'days_supervised > 300'")
+    name, symbol, keyword, value = match.groups()
+    symbol = (symbol or keyword).lower()
+    columns = {column.lower(): column for column in df.columns}
+    column = columns.get(name.lower())
+    if column is None:
+        raise ValueError(f"Unknown column '{name}'")
+    series = df[column]
+    value = value.strip('"\'')
+    present = series.notna().to_numpy(dtype=bool)
+
+    if symbol == "in":
+        if column not in DATE_COLUMNS:
+            raise ValueError(f"'in FY..' only works on the date columns: {', '.join(DATE_COLUMNS)}")
+        first, last = fiscal_year(value)
+        return ((series >= first) & (series <= last)).to_numpy(dtype=bool) & present
+    if symbol == "~":
+        needle = value.casefold()
+        return text_mask(series, lambda values: values.str.casefold().str.contains(needle, regex=False)) & present
+
+    if column in DATE_COLUMNS:
+        value = parse_date_value(value)
+    elif column in COUNT_COLUMNS:
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f"Expected a whole number for {column}, got '{value}'") from None
+    elif symbol in ("=", "!="):
+        needle = value.casefold()
+        mask = text_mask(series, lambda values: values.str.casefold() == needle)
+        return (~mask if symbol == "!=" else mask) & present
+    else:
+        raise ValueError(f"'{symbol}' only works on the date and day count columns")
+
+    compared = COMPARISONS[symbol](series, value)
+    return compared.fillna(False).to_numpy(dtype=bool) & present
+
+def query_mask(df, query):
+    """
+    Returns the boolean mask of the rows of df matching query: clauses joined by AND, each a column
+    name, an operator and a value. Dates and day counts take =, !=, <, <=, > and >=, and dates also
+    'in FY25'. Text columns take = and != (ignoring case) and ~ for "contains".
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for clause in CLAUSE_SEPARATOR.split(query.strip()):
+        mask &= clause_mask(df, clause)
+    return mask
+
+EXPORT_FORMATS = (".csv", ".jsonl", ".txt")
+
+def write_rows(chunks, columns, output_file):
+    """
+    Streams chunks of rows, each a tuple of the named columns, to output_file one chunk at a time:
+    CSV with a header row, JSON Lines with one object per row, or tab-separated text, picked by the
+    file extension. Returns the number of rows written.
+    """
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Can only export to {', '.join(EXPORT_FORMATS)} files, not '{output_file}'")
+    count = 0
+    with open(output_file, mode='w', newline='') as f:
+        if extension == ".csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for rows in chunks:
+            if extension == ".csv":
+                writer.writerows(rows)
+            elif extension == ".jsonl":
+                f.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+            else:
+                f.writelines("\t".join(row) + "\n" for row in rows)
+            count += len(rows)
+    return count
@@ -0,0 +1,116 @@
+"""
+Finds statements that were copy-pasted or lightly edited across EPBs.
+
+Each statement is cut into overlapping three-word shingles and summarized by a MinHash signature,
+whose positions agree about as often as the shingle sets overlap (their Jaccard similarity).
+Locality-sensitive hashing then only compares statements that share a band of their signature,
+so the work grows with the number of statements instead of the number of pairs.
+"""
+import os
+import re
+import csv
+import zlib
+import numpy as np
+
+DUPLICATE_HEADER = ["group_id", "Category", "Statement", "file_path", "Name"]
+
+WORD = re.compile(r"\w+")
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+HASH_MASK = np.uint64(0xFFFFFFFF)
+CHUNK_STATEMENTS = 1024  # Statements hashed per vectorized step, bounds the temporary shingle x permutation matrix
+
+def shingles(words, size=3):
+    """Returns the hashes of the size-word shingles of a list of words."""
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode())}
+    return {zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+def minhash_signatures(shingle_sets, num_perm=128, seed=1):
+    """Returns a (statements x num_perm) array with the MinHash signature of every shingle set."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint32)
+    for start in range(0, len(shingle_sets), CHUNK_STATEMENTS):
+        chunk = shingle_sets[start:start + CHUNK_STATEMENTS]
+        lengths = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+        hashes = np.fromiter((h for hashes in chunk for h in hashes), dtype=np.uint64, count=int(lengths.sum()))
+        # Every permutation of every shingle at once; the uint64 products wrap around, which keeps them random
+        permuted = ((hashes[:, None] * a + b) % MERSENNE_PRIME) & HASH_MASK
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures
+
+def candidate_pairs(signatures, bands=32):
+    """
+    Returns (i, j) row pairs whose signatures are identical in at least one band. Rows sharing a
+    band are paired with the first of them only, so a large group of copies stays linear.
+    """
+    rows = signatures.shape[1] // bands
+    everyone = np.arange(len(signatures))
+    pairs = []
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, first, bucket = np.unique(keys, return_index=True, return_inverse=True)
+        leaders = first[bucket.ravel()]
+        followers = everyone[leaders != everyone]
+        pairs.append(np.stack([leaders[followers], followers], axis=1))
+    return np.unique(np.concatenate(pairs), axis=0)
+
+def find_duplicates(statements, threshold=0.7, min_words=5, num_perm=128, bands=32):
+    """
+    Groups near-duplicate statements. Returns a list of groups, each a sorted list of at least two
+    indexes into statements, ordered by their first index. Two statements are linked when the
+    estimated Jaccard similarity of their shingles is at least threshold; groups are the linked
+    components. Statements shorter than min_words are ignored, since short bullets collide by chance.
+    """
+    words = [WORD.findall(statement.lower()) for statement in statements]  # Ignores case and punctuation
+    kept = [i for i, statement_words in enumerate(words) if len(statement_words) >= min_words]
+    if len(kept) < 2:
+        return []
+    signatures = minhash_signatures([shingles(words[i]) for i in kept], num_perm)
+    pairs = candidate_pairs(signatures, bands)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[similarity >= threshold]
+
+    # Union-find over the verified pairs
+    parent = list(range(len(kept)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        i, j = root(i), root(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    groups = {}
+    for position, index in enumerate(kept):
+        groups.setdefault(root(position), []).append(index)
+    return [group for group in groups.values() if len(group) > 1]
+
+def duplicate_groups(records, threshold=0.7, min_words=5):
+    """Returns the groups of near-duplicate records, comparing their Statement column."""
+    records = list(records)
+    return [[records[i] for i in group]
+            for group in find_duplicates([str(record[1]) for record in records], threshold, min_words)]
+
+def save_duplicates(groups, output_file):
+    """Writes one row per statement of each group, with its source file and name. Returns the row count."""
+    count = 0
+    with open(output_file, mode='w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DUPLICATE_HEADER)
+        for group_id, group in enumerate(groups, 1):
+            for record in group:
+                writer.writerow([group_id] + list(record[:4]))
+                count += 1
+    return count
+
+def duplicates_path_for(output_file):
+    """Returns where the near-duplicate groups found in output_file are written."""
+    return os.path.splitext(output_file)[0] + "_duplicates.csv"
@@ -1,14 +1,29 @@
 import os
 import re
 import csv
+import json
+import sqlite3
+import hashlib
+import heapq
+import argparse
+import threading
+import queue
+import time
+import zipfile
+import platform
+import multiprocessing
+from collections import deque, namedtuple
+from itertools import islice
 import fitz  # PyMuPDF
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Future, ProcessPoolExecutor, wait
+from datetime import date
+from functools import lru_cache
+from contextlib import contextmanager
 import sys
-import pandas as pd
-from PyQt6.QtWidgets import QApplication, QWidget, QComboBox, QLineEdit, QTableView, QPushButton, QLabel, \
-							QHBoxLayout, QVBoxLayout
-from PyQt6.QtCore import Qt, QAbstractTableModel, QVariant, QModelIndex
-from PyQt6.QtGui import QIcon
+try:
+    import resource  # Peak memory and the worker memory budget; not available on Windows
+except ImportError:
+    resource = None
                
 # Define the static text to ignore
 IGNORE_TEXT = {
@@ -41,250 +56,505 @@ CATEGORIES = [
     "HIGHER LEVEL REVIEWER ASSESSMENT"
 ]
 
-def parse_pdf(file_path):
-    file_name = os.path.basename(file_path).split('-')[0]  # Extract name before hyphen
-    
-    document = fitz.open(file_path)
-    text = ""
-    for page_num in range(document.page_count):
-        page = document.load_page(page_num)
-        text += page.get_text("text")
+# Bump whenever a change to parse_pdf alters its output, so cached results are re-parsed
+PARSER_VERSION = 4
+
+def parser_signature(extraction="text"):
+    """
+    Identifies the parser version, label tables and text extraction mode, so changing IGNORE_TEXT
+    or CATEGORIES invalidates previously cached results.
+    """
+    config = json.dumps([PARSER_VERSION, CATEGORIES, IGNORE_TEXT, extraction], sort_keys=True)
+    return hashlib.sha1(config.encode("utf-8")).hexdigest()
+
+class ParseCache:
+    """
+    On-disk cache of parse_pdf results keyed by file path, size and modification time.
+    Entries written by a different parser signature are dropped when the cache is opened.
+    """
+
+    def __init__(self, cache_file, extraction="text"):
+        self.cache_file = cache_file
+        self.signature = parser_signature(extraction)
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self.connection = sqlite3.connect(cache_file)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "file_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, parser TEXT, records TEXT)"
+        )
+        self.connection.execute("DELETE FROM entries WHERE parser != ?", (self.signature,))
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(failures)")]
+        if columns and "kind" not in columns:
+            self.connection.execute("DROP TABLE failures")  # Written before failures recorded their budget
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS failures (file_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "parser TEXT, reason TEXT, kind TEXT, timeout REAL, memory_mb INTEGER)"
+        )
+        self.connection.execute("DELETE FROM failures WHERE parser != ?", (self.signature,))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS digests (file_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+        )
+
+    def get(self, file_path, stat):
+        """Returns the cached records for file_path, or None if it is new or has changed."""
+        row = self.connection.execute(
+            "SELECT records FROM entries WHERE file_path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, file_path, stat, records):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (file_path, stat.st_size, stat.st_mtime_ns, self.signature, json.dumps(records))
+        )
+        self.connection.execute("DELETE FROM failures WHERE file_path = ?", (file_path,))
+
+    def get_failure(self, file_path, stat, budget=None):
+        """
+        Returns the ParseFailure that quarantined file_path at this size and modification time, or
+        None if there is none or it may not happen again: a timeout or memory failure is only
+        returned when budget is no larger than the one it broke.
+        """
+        row = self.connection.execute(
+            "SELECT reason, kind, timeout, memory_mb FROM failures WHERE file_path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row is None:
+            return None
+        reason, kind, timeout, memory_mb = row
+        if kind == "timeout" and not (budget and budget.timeout and budget.timeout <= timeout):
+            return None
+        if kind == "memory" and not (budget and budget.memory_mb and budget.memory_mb <= memory_mb):
+            return None
+        self.hits += 1
+        return ParseFailure(reason, kind)
+
+    def put_failure(self, file_path, stat, failure, budget=None):
+        """
+        Records why file_path was quarantined, with the budget it broke. Crashed workers and
+        failures without a limit to compare against are not recorded, as they may not happen again.
+        """
+        timeout, memory_mb = budget if budget else (None, None)
+        if (failure.kind == "crash" or failure.kind == "timeout" and not timeout
+                or failure.kind == "memory" and not memory_mb):
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (file_path, stat.st_size, stat.st_mtime_ns, self.signature, failure.reason, failure.kind, timeout,
+             memory_mb)
+        )
+        self.connection.execute("DELETE FROM entries WHERE file_path = ?", (file_path,))
+
+    def prune(self, file_paths):
+        """Drops entries and failures for files that are no longer part of the batch."""
+        keep = set(file_paths)
+        stale = [(path,) for (path,) in self.connection.execute("SELECT file_path FROM entries") if path not in keep]
+        self.connection.executemany("DELETE FROM entries WHERE file_path = ?", stale)
+        self.removed += len(stale)
+        stale = [(path,) for (path,) in self.connection.execute("SELECT file_path FROM failures") if path not in keep]
+        self.connection.executemany("DELETE FROM failures WHERE file_path = ?", stale)
+
+    def get_digest(self, file_path, stat):
+        """Returns the content hash recorded for file_path, or None if it is new or has changed."""
+        row = self.connection.execute(
+            "SELECT digest FROM digests WHERE file_path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_digest(self, file_path, stat, digest):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)", (file_path, stat.st_size, stat.st_mtime_ns, digest)
+        )
+
+    def prune_digests(self, file_paths):
+        """Drops the content hashes of files that are no longer found."""
+        keep = set(file_paths)
+        stale = [(path,) for (path,) in self.connection.execute("SELECT file_path FROM digests") if path not in keep]
+        self.connection.executemany("DELETE FROM digests WHERE file_path = ?", stale)
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        """Drops the changes made since the last commit."""
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def summary(self):
+        return f"Parse cache: {self.hits} hits, {self.misses} misses, {self.removed} removed"
+
+def peak_memory_mb():
+    """Returns the peak resident memory of this process in MB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)  # Bytes on macOS, KB elsewhere
+
+def address_space_bytes():
+    """Returns the virtual memory size of this process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class ParseStats:
+    """
+    Where the time went while parsing one PDF: wall and CPU seconds per phase, plus page and
+    record counts, the fields that were present but malformed, and how far the PDF pushed up the
+    peak memory of the process that parsed it.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.peak_before = peak_memory_mb()
+        self.phases = {}  # phase -> [wall seconds, CPU seconds]
+        self.pages = 0
+        self.records = 0
+        self.malformed = []  # (field, rejected value)
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add(self, name, wall, cpu):
+        totals = self.phases.setdefault(name, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    def field_malformed(self, field, value):
+        self.malformed.append((field, value))
+
+    def as_dict(self):
+        """Returns the stats as plain JSON-ready values, so they can be sent back from a worker process."""
+        peak = peak_memory_mb()
+        return {
+            "file_path": self.file_path,
+            "pages": self.pages,
+            "records": self.records,
+            "wall": sum(wall for wall, _ in self.phases.values()),
+            "cpu": sum(cpu for _, cpu in self.phases.values()),
+            "phases": {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self.phases.items()},
+            "malformed": [{"field": field, "value": value} for field, value in self.malformed],
+            # The peak only ever rises, so a PDF that stayed below an earlier one's peak shows 0
+            "peak_memory_growth_mb": None if peak is None else peak - self.peak_before,
+            "process_peak_memory_mb": peak,  # Taken out by RunReport.add, it is not about this PDF
+        }
+
+# Metadata captured once per PDF and appended, in this order, to every record
+METADATA_FIELDS = [
+    "days_supervised", "days_non_rated", "duty_title", "dafsc", "reason", "period_start", "period_end",
+    "org", "location", "ratee_signed", "rater_name", "rater_signed", "rater_duty_title", "hlr_name",
+    "hlr_duty_title", "hlr_signed", "strat", "promotion_recommendation",
+    "future_role_1", "future_role_2", "future_role_3"
+]
+
+HLR_NAME_LABEL = "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE"
+FUTURE_ROLES_LABEL = "FUTURE ROLES"
+
+def next_line_text(next_line):
+    """Returns the line following a label."""
+    return next_line.strip()
+
+def next_line_unless(marker):
+    """
+    Returns an extractor for a field that may be left blank, in which case the line following
+    the label is already marker and the field is recorded as "".
+    """
+    def extract(next_line):
+        if marker in next_line:
+            return ""
+        return next_line.strip()
+    return extract
 
-    lines = text.splitlines()
+def next_line_number(next_line):
+    return extract_number_from_text(next_line)
+
+def signed_date(blank_marker):
+    """
+    Returns an extractor for the date in a signature line ("NAME, GRADE, ..., D Mmm YY").
+    An unsigned block, where the line following the label is blank_marker, yields None.
+    """
+    def extract(next_line):
+        if blank_marker and blank_marker in next_line:
+            return None
+        parts = next_line.strip().split(',')
+        if len(parts) <= 3:
+            return None
+        return parts[3].strip().strip('\\')  # Extract the date and clean up backslashes
+    return extract
+
+def period_dates(next_line):
+    """Splits a "D Mmm YY THRU D Mmm YY" line into its start and end dates."""
+    period_text = next_line.strip()
+    if "THRU" not in period_text:
+        return None, None
+    period_start, period_end = period_text.split("THRU", 1)
+    return period_start.strip(), period_end.strip()
+
+# label: (field or tuple of fields, extractor applied to the following line, only use the first occurrence)
+FIELD_LABELS = {
+    "HIGHER LEVEL REVIEWER DUTY TITLE": ("hlr_duty_title", next_line_text, True),
+    HLR_NAME_LABEL: ("hlr_name", next_line_text, True),
+    "RATER NAME, GRADE, AND BRANCH OF SERVICE": ("rater_name", next_line_text, True),
+    "HIGHER LEVEL REVIEWER SIGNATURE": ("hlr_signed", signed_date("HIGHER LEVEL REVIEWER DUTY TITLE"), True),
+    "RATER SIGNATURE": ("rater_signed", signed_date(None), True),
+    "RATER DUTY TITLE": ("rater_duty_title", next_line_text, True),
+    "RATEE ACKNOWLEDGEMENT": ("ratee_signed", signed_date("ORGANIZATION AND COMMAND"), True),
+    "STRATIFICATION": ("strat", next_line_unless("FORCED ENDORSEMENT"), True),
+    "PROMOTION RECOMMENDATION": ("promotion_recommendation", next_line_unless("RATER ASSESSMENT"), True),
+    "DAYS SUPERVISED": ("days_supervised", next_line_number, False),
+    "DAYS NON-RATED": ("days_non_rated", next_line_number, False),
+    "DUTY TITLE": ("duty_title", next_line_unless("DAFSC"), True),
+    "DAFSC": ("dafsc", next_line_text, True),
+    "REASON": ("reason", next_line_text, True),
+    "ORGANIZATION AND COMMAND": ("org", next_line_text, True),
+    "LOCATION": ("location", next_line_text, True),
+    "PERIOD": (("period_start", "period_end"), period_dates, True),
+}
+
+# Fields that must hold a 'D Mmm YY' date; anything else is counted as malformed and recorded as None
+DATE_FIELDS = frozenset(["period_start", "period_end", "ratee_signed", "rater_signed", "hlr_signed"])
+
+def trie_pattern(words):
+    """
+    Builds a regex alternation of words factored into a prefix trie, e.g. "RATE(?:E ...|R (?:...))",
+    so the regex engine rejects a position after a character or two instead of trying every word.
+    Longer words are preferred where one word is a prefix of another.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+class LabelMatcher:
+    """
+    Finds every label from a fixed set that occurs in a line with a single regex scan.
+    """
+
+    def __init__(self, labels):
+        labels = sorted(set(labels))
+        # The scan does not return overlapping matches, so a label also reports the labels it
+        # contains ("RATER DUTY TITLE" implies "DUTY TITLE").
+        self.implied = {label: frozenset(other for other in labels if other in label) for label in labels}
+        if self._words_overlap(labels):
+            # A label could start inside another one and run past its end, which only a lookahead scan finds
+            self.pattern = re.compile("(?=(" + trie_pattern(labels) + "))")
+        else:
+            self.pattern = re.compile(trie_pattern(labels))
+
+    @staticmethod
+    def _words_overlap(labels):
+        """Checks whether the trailing words of one label are the leading words of another."""
+        for label in labels:
+            words = label.split(" ")
+            for start in range(1, len(words)):
+                suffix = " ".join(words[start:])
+                for other in labels:
+                    if other != label and other.startswith(suffix) and other not in label:
+                        return True
+        return False
+
+    def find(self, line):
+        """Returns the set of labels found in line."""
+        matches = self.pattern.findall(line)
+        if not matches:
+            return frozenset()
+        if len(matches) == 1:
+            return self.implied[matches[0]]
+        return frozenset().union(*(self.implied[label] for label in matches))
+
+CATEGORY_PATTERN = re.compile(trie_pattern(CATEGORIES))
+IGNORED_LABELS = {category: frozenset(texts) for category, texts in IGNORE_TEXT.items()}
+LINE_MATCHER = LabelMatcher(
+    list(FIELD_LABELS) + [FUTURE_ROLES_LABEL] + [text for texts in IGNORE_TEXT.values() for text in texts]
+)
+
+EXTRACTION_MODES = ("text", "blocks")
+LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"  # Everything str.splitlines() splits on
+
+def iter_lines(document, extraction="text", stats=None):
+    """
+    Yields the text lines of document one page at a time, so only the current page's text is held.
+    "text" yields the same lines as splitting the text of the whole document; "blocks" reads the
+    page's text blocks sorted top to bottom, left to right, which keeps multi-column layouts in
+    reading order. The time spent extracting text is added to stats, if given, as "get_text".
+    """
+    carry = ""  # A line that runs on past the end of a page
+    for page in document:
+        wall, cpu = time.perf_counter(), time.process_time()
+        if extraction == "blocks":
+            # Block tuples are (x0, y0, x1, y1, text, block number, block type); type 1 is an image
+            text = "".join(block[4] if block[4].endswith("\n") else block[4] + "\n"
+                           for block in page.get_text("blocks", sort=True) if block[6] == 0)
+        else:
+            text = page.get_text("text")
+        if stats:
+            stats.add("get_text", time.perf_counter() - wall, time.process_time() - cpu)
+        text = carry + text
+        lines = text.splitlines()
+        carry = ""
+        if text and text[-1] not in LINE_BREAKS:
+            carry = lines.pop()
+        yield from lines
+    if carry:
+        yield carry
+
+def with_following(lines, count=3):
+    """Yields each line together with a tuple of up to count lines that follow it."""
+    window = deque(maxlen=count + 1)
+    for line in lines:
+        window.append(line)
+        if len(window) > count:
+            yield window[0], tuple(islice(window, 1, None))
+    while window:
+        current = window.popleft()
+        if len(window) < count:
+            yield current, tuple(window)
+
+def parse_pdf(file_path, extraction="text", stats=None, stream=None):
+    """
+    Yields the records of one PDF. file_path may also name a PDF inside a zip archive (see
+    find_pdfs), or stream may hold the bytes of the PDF, in which case file_path only names it.
+    Timings, the page and record counts and malformed fields are recorded in stats, if given.
+    """
+    if stats is None:
+        stats = ParseStats(file_path)
+    # Extract name before hyphen, from the member's own name for a PDF inside a zip archive
+    archive, member = split_source(file_path)
+    file_name = os.path.basename(member or archive).split('-')[0]
+
+    with stats.phase("open"):
+        document = open_document(file_path, stream)
+    with document:
+        stats.pages = document.page_count
+        wall, cpu = time.perf_counter(), time.process_time()
+        categorized_statements, metadata = categorize_lines(iter_lines(document, extraction, stats), file_path,
+                                                            file_name, stats)
+        # Whatever was not spent reading text or splitting statements went to classifying lines
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        for name in ("get_text", "remove_unwanted_text", "split_sentences"):
+            spent = stats.phases.get(name, (0.0, 0.0))
+            wall, cpu = wall - spent[0], cpu - spent[1]
+        stats.add("classify", wall, cpu)
+    stats.records = len(categorized_statements)
+
+    # Add the extracted values to each record for this PDF
+    metadata_values = [metadata[field] for field in METADATA_FIELDS]
+    for record in categorized_statements:
+        yield record + metadata_values
+
+def categorize_lines(lines, file_path, file_name, stats=None):
+    """
+    Sorts the lines of one EPB into category statements and captures the document-level fields.
+    Returns the statement records and a dict of METADATA_FIELDS. Malformed dates are counted in stats.
+    """
+    if stats is None:
+        stats = ParseStats(file_path)
     categorized_statements = []
     current_category = None
     statement = []
     recent_lines = []  # Store last 3 lines for HIGHER LEVEL REVIEWER ASSESSMENT
-    days_supervised = None  # To store the number of days supervised
-    duty_title = None  # To store the duty title
-    duty_title_found = False  # Flag to check if we have already found the first "DUTY TITLE"
-    dafsc = None  # To store the DAFSC
-    dafsc_found = False  # Flag to check if we have already found the first "DAFSC"
-    reason = None  # To store the reason
-    reason_found = False  # Flag to check if we have already found the first "REASON"
-    org = None  # To store the organization
-    org_found = False  # Flag to check if we have already found the first "ORGANIZATION AND COMMAND"
-    period_start = None  # To store the period start date
-    period_end = None  # To store the period end date
-    period_found = False  # Flag to check if we have already found the first "PERIOD"
-    location = None  # To store the location
-    location_found = False  # Flag to check if we have already found the first "LOCATION"
-    ratee_signed = None  # To store the ratee signed date
-    ratee_signed_found = False  # Flag to check if we have already found the first "RATEE ACKNOWLEDGEMENT"
-    rater_name = None  # To store the rater name
-    rater_name_found = False  # Flag to check if we have already found the first "RATER NAME, GRADE, AND BRANCH OF SERVICE"
-    rater_signed = None  # To store the rater signed date
-    rater_signed_found = False  # Flag to check if we have already found the first "RATER SIGNATURE"
-    rater_duty_title = None  # To store the RATER DUTY TITLE
-    rater_duty_title_found = False  # Flag to check if we have already found the first "DUTY TITLE"
-    hlr_name = None  # To store the HIGHER LEVEL REVIEWER NAME
-    hlr_name_found = False  # Flag to check if we have already found the first "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE"
-    hlr_duty_title_found = False  # Flag to check if we have already found the first "HIGHER LEVEL REVIEWER DUTY TITLE"
-    hlr_duty_title = None  # To store the HIGHER LEVEL REVIEWER DUTY TITLE
-    hlr_signed = None  # To store the HIGHER LEVEL REVIEWER SIGNATURE
-    hlr_signed_found = False  # Flag to check if we have already found the first "HIGHER LEVEL REVIEWER SIGNATURE"
-    strat = None  # To store the STRATIFICATION
-    strat_found = False  # Flag to check if we have already found the first "STRATIFICATION"
-    future_roles = {"1": None, "2": None, "3": None}  # Store future roles
-    promotion_recommendation = None  # To store the promotion recommendation
-    promotion_recommendation_found = False  # Flag to check if we have already found the first "PROMOTION RECOMMENDATION"
-    days_non_rated = None  # To store the number of days non-rated
-
-    for i, line in enumerate(lines):
-        
-       
-        for category in CATEGORIES:
-            if line.startswith(category):
-                if current_category and statement:
-                    filtered_statement = remove_unwanted_text(current_category, ' '.join(statement))
-                    categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
-                
-                current_category = category
-                statement = [line[len(category):].strip()]
-                recent_lines = []  # Reset recent lines
-                break
-        else:
-            if any(ignored_text in line for ignored_text in IGNORE_TEXT.get(current_category, [])):
+    metadata = dict.fromkeys(METADATA_FIELDS)
+    found = set()  # Labels whose first occurrence has already been captured
+
+    pending = []  # (category, statement text), cleaned and split after the last line
+
+    for line, following in with_following(lines):
+        category_match = CATEGORY_PATTERN.match(line)
+        if category_match:
+            if current_category and statement:
+                pending.append((current_category, ' '.join(statement)))
+
+            current_category = category_match.group(0)
+            statement = [line[len(current_category):].strip()]
+            recent_lines = []  # Reset recent lines
+            continue
+
+        labels = LINE_MATCHER.find(line)
+        if labels and not labels.isdisjoint(IGNORED_LABELS.get(current_category, ())):
+            continue
+
+        if current_category == "HIGHER LEVEL REVIEWER ASSESSMENT":
+            if HLR_NAME_LABEL in labels:
+                # Capture only the last 3 lines before this marker, and add them as individual records
+                pending.append((current_category, ' '.join(recent_lines[-3:])))
+                current_category = None  # Stop further processing for this category
+            elif FUTURE_ROLES_LABEL in labels:
+                # Roles "1." to "3." are on the next three lines; a missing or unnumbered line leaves its role None
+                for number, next_line in enumerate(following, 1):
+                    marker = f"{number}."
+                    if marker in next_line:
+                        metadata[f"future_role_{number}"] = next_line.strip().split(marker, 1)[1].strip()
+            else:
+                recent_lines.append(line.strip())
+                recent_lines = recent_lines[-5:]  # Keep only the last 5 lines (extra buffer)
+
+        elif current_category:
+            statement.append(line.strip())
+
+        if not labels or not following:
+            continue
+
+        # Capture the fields whose label appears in this line from the line that follows it
+        for label in labels:
+            spec = FIELD_LABELS.get(label)
+            if spec is None:
                 continue
-            
-            if current_category == "HIGHER LEVEL REVIEWER ASSESSMENT":
-                if "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE" in line:
-                    # Capture only the last 3 lines before this marker
-                    statement = recent_lines[-3:]  # Get the last 3 non-empty lines
-                    filtered_statement = remove_unwanted_text(current_category, ' '.join(statement))
-                    # Split and add this statement as individual records
-                    categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
-                    current_category = None  # Stop further processing for this category
-                
-                
-                elif "FUTURE ROLES" in line:
-                    future_roles["1"] = lines[i + 1].strip().split("1.", 1)[1].strip()  # Extract role 1
-                    future_roles["2"] = lines[i + 2].strip().split("2.", 1)[1].strip()  # Extract role 2
-                    future_roles["3"] = lines[i + 3].strip().split("3.", 1)[1].strip()  # Extract role 3
-                else:
-                    recent_lines.append(line.strip())  
-                    recent_lines = recent_lines[-5:]  # Keep only the last 5 lines (extra buffer)
-
-            elif current_category:
-                statement.append(line.strip())
-            
-            if "HIGHER LEVEL REVIEWER DUTY TITLE" in line and not hlr_duty_title_found and i + 1 < len(lines):
-                    # Capture the line following "HIGHER LEVEL REVIEWER DUTY TITLE"
-                    hlr_duty_title = lines[i + 1].strip()
-                    hlr_duty_title_found = True
-            
-            if "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE" in line and not hlr_name_found and i + 1 < len(lines):
-                hlr_name = lines[i + 1].strip()
-                hlr_name_found = True
-            
-            if "RATER NAME, GRADE, AND BRANCH OF SERVICE" in line and not rater_name_found and i + 1 < len(lines):
-                rater_name = lines[i + 1].strip()
-                rater_name_found = True
-            
-            if "HIGHER LEVEL REVIEWER SIGNATURE" in line and not hlr_signed_found and i + 1 < len(lines):
-                if "HIGHER LEVEL REVIEWER DUTY TITLE" in lines[i + 1]:
-                    hlr_signature = ""
-                else:
-                    hlr_signature = lines[i + 1].strip()
-                    parts = hlr_signature.split(',')
-                
-                if len(parts) > 3:
-                    hlr_signed = parts[3].strip().strip('\\')  # Extract and clean the date
-
-                    # Validate format
-                    if not is_valid_date(hlr_signed):
-                        print(f"Invalid higher-level reviewer signed date format: {hlr_signed}")
-                        hlr_signed = None  # Handle invalid date as needed
-
-                hlr_signed_found = True
-
-            if "RATER SIGNATURE" in line and not rater_signed_found and i + 1 < len(lines):
-                rater_signature = lines[i + 1].strip()
-                parts = rater_signature.split(',')
-                
-                if len(parts) > 3:
-                    rater_signed = parts[3].strip().strip('\\')  # Extract and clean the date
-
-                    # Validate format
-                    if not is_valid_date(rater_signed):
-                        print(f"Invalid rater signed date format: {rater_signed}")
-                        rater_signed = None  # Handle invalid date as needed
-
-                rater_signed_found = True
-
-            if "RATER DUTY TITLE" in line and not rater_duty_title_found and i + 1 < len(lines):
-                rater_duty_title = lines[i + 1].strip()  # Capture the line following "RATER DUTY TITLE"
-                rater_duty_title_found = True  # Set flag to indicate we've found the first instance of "RATER DUTY TITLE"
-
-            if "RATEE ACKNOWLEDGEMENT" in line and not ratee_signed_found and i + 1 < len(lines):
-                if "ORGANIZATION AND COMMAND" in lines[i + 1]:
-                    ratee_signature = ""
-                else:
-                    ratee_signature = lines[i + 1].strip()
-                    parts = ratee_signature.split(',')
-                
-                if len(parts) > 3:
-                    ratee_signed = parts[3].strip().strip('\\')  # Extract the date and clean up backslashes
-
-                    # Validate format
-                    if not is_valid_date(ratee_signed):
-                        print(f"Invalid ratee signed date format: {ratee_signed}")
-                        ratee_signed = None  # Set to None or handle as needed
-
-                ratee_signed_found = True  # Set flag to indicate we've found the first instance of "RATEE ACKNOWLEDGEMENT"
-            if "STRATIFICATION" in line and not strat_found and i + 1 < len(lines):
-                    if "FORCED ENDORSEMENT" in lines[i + 1]:
-                        strat = ""
-                    else:
-                        strat = lines[i + 1].strip()  # Capture the line following "STRATIFICATION"
-                    strat_found = True
-            if "PROMOTION RECOMMENDATION" in line and not promotion_recommendation_found and i + 1 < len(lines):
-                if "RATER ASSESSMENT" in lines[i + 1]:
-                    promotion_recommendation = ""
-                else:
-                    promotion_recommendation = lines[i + 1].strip()
-                promotion_recommendation_found = True
-
-            # Look for the "DAYS SUPERVISED" text and extract the next three numbers
-            if "DAYS SUPERVISED" in line and i + 1 < len(lines):
-                days_supervised = extract_number_from_text(lines[i + 1]) 
-            
-            if "DAYS NON-RATED" in line and i + 1 < len(lines):
-                days_non_rated = extract_number_from_text(lines[i + 1])
-
-            # Look for the first "DUTY TITLE" text and extract the next line
-            if "DUTY TITLE" in line and not duty_title_found and i + 1 < len(lines):
-                if "DAFSC" in lines[i + 1]:
-                    duty_title = ""
-                else:
-                    duty_title = lines[i + 1].strip()  # Capture the line following "DUTY TITLE"
-                duty_title_found = True  # Set flag to indicate we've found the first instance of "DUTY TITLE"
-
-            # Look for the first "DAFSC" text and extract the next line
-            if "DAFSC" in line and not dafsc_found and i + 1 < len(lines):
-                dafsc = lines[i + 1].strip()  # Capture the line following "DAFSC"
-                dafsc_found = True  # Set flag to indicate we've found the first instance of "DAFSC"
-
-            # Look for the first "REASON" text and extract the next line
-            if "REASON" in line and not reason_found and i + 1 < len(lines):
-                reason = lines[i + 1].strip()  # Capture the line following "REASON"
-                reason_found = True  # Set flag to indicate we've found the first instance of "REASON"
-
-            # Look for the first "ORGANIZATION AND COMMAND" text and extract the next line
-            if "ORGANIZATION AND COMMAND" in line and not org_found and i + 1 < len(lines):
-                org = lines[i + 1].strip()  # Capture the line following "ORGANIZATION AND COMMAND"
-                org_found = True 
-
-            # Look for the first "LOCATION" text and extract the next line
-            if "LOCATION" in line and not location_found and i + 1 < len(lines):
-                location = lines[i + 1].strip()  # Capture the line following "LOCATION"
-                location_found = True
-
-            if "PERIOD" in line and not period_found and i + 1 < len(lines):
-                period_text = lines[i + 1].strip()  # Capture the line following "PERIOD"
-                if "THRU" in period_text:
-                    period_start, period_end = period_text.split("THRU", 1)
-                    period_start = period_start.strip()
-                    period_end = period_end.strip()
-
-                    # Validate format
-                    if not is_valid_date(period_start):
-                        period_start = None  # Set to None or handle as needed
-                    if not is_valid_date(period_end):
-                        period_end = None  # Set to None or handle as needed
-
-                period_found = True  # Set flag to indicate we've found the first instance of "PERIOD" 
+            field, extract, first_only = spec
+            if first_only:
+                if label in found:
+                    continue
+                found.add(label)
+            value = extract(following[0])
+            captured = zip(field, value) if isinstance(field, tuple) else [(field, value)]
+            for name, text in captured:
+                if name in DATE_FIELDS and text is not None and not is_valid_date(text):
+                    stats.field_malformed(name, text)
+                    text = None
+                metadata[name] = text
 
     if current_category and statement:
-        filtered_statement = remove_unwanted_text(current_category, ' '.join(statement))
-        categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
-       
-    # Add the extracted values to each record for this PDF
-    for record in categorized_statements:
-      
-        record.append(days_supervised)  # Append days_supervised to each record
-        record.append(days_non_rated)  # Append days_non_rated to each record
-        record.append(duty_title)  # Append duty_title to each record
-        record.append(dafsc)  # Append dafsc to each record
-        record.append(reason)  # Append reason to each record
-        record.append(period_start)  # Append period_start to each record
-        record.append(period_end)  # Append period_end to each record
-        record.append(org)  # Append org to each record
-        record.append(location)  # Append location to each record
-        record.append(ratee_signed)  # Append ratee_signed to each record
-        record.append(rater_name)  # Append rater_name to each record
-        record.append(rater_signed)  # Append rater_signed to each record
-        record.append(rater_duty_title)  # Append rater_duty_title to each record
-        record.append(hlr_name)  # Append hlr_name to each record
-        record.append(hlr_duty_title)  # Append hlr_duty_title to each record
-        record.append(hlr_signed)  # Append hlr_signed to each record
-        record.append(strat)  # Append strat to each record
-        record.append(promotion_recommendation)  # Append promotion_recommendation to each record
-        record.append(future_roles["1"])  # Append future_role_1 to each record
-        record.append(future_roles["2"])  # Append future_role_2 to each record
-        record.append(future_roles["3"])  # Append future_role_3 to each record
-        
-    return categorized_statements
+        pending.append((current_category, ' '.join(statement)))
+
+    # Timed once per PDF rather than per statement, since timing costs about as much as cleaning a short statement
+    wall, cpu = time.perf_counter(), time.process_time()
+    filtered = [(category, remove_unwanted_text(category, text)) for category, text in pending]
+    split_wall, split_cpu = time.perf_counter(), time.process_time()
+    for category, filtered_statement in filtered:
+        categorized_statements.extend(split_sentences(category, filtered_statement, file_path, file_name))
+    end_wall, end_cpu = time.perf_counter(), time.process_time()
+    stats.add("remove_unwanted_text", split_wall - wall, split_cpu - cpu)
+    stats.add("split_sentences", end_wall - split_wall, end_cpu - split_cpu)
+    return categorized_statements, metadata
 
 def extract_number_from_text(text):
     """
@@ -295,6 +565,12 @@ def extract_number_from_text(text):
         return match[0]  # Return the first number found as a string
     return None
 
+# A sentence ends at ., ! or ? followed by whitespace, which keeps the old sentence boundaries:
+# periods inside numbers (1.4) never split, while "Dr. Smith" and "U.S. Army" still split after
+# the abbreviation as they always have.
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+SENTENCE_ENDINGS = ('.', '!', '?')
+
 def split_sentences(category, statement, file_path, file_name):
     """
     Splits a statement into multiple records if it contains more than one complete sentence.
@@ -303,38 +579,42 @@ def split_sentences(category, statement, file_path, file_name):
     # If the category is "HIGHER LEVEL REVIEWER ASSESSMENT", return the statement as is
     if category == "HIGHER LEVEL REVIEWER ASSESSMENT":
         return [[category, statement, file_path, file_name]]
-    
-    # For other categories, proceed with splitting the statement into sentences
-
-    # First, replace common abbreviations and numeric periods with a placeholder to prevent splitting
-    statement = re.sub(r'\b(?:Dr|Mr|Ms|U\.S\.)\b', lambda match: match.group(0).replace('.', '__DOT__'), statement)
-    statement = re.sub(r'(\d)(?=\.\d)', r'\1__DOT__', statement)  # Handle numeric periods like 1.4
-
-    # Now split the statement on standard sentence-ending punctuation
-    sentences = re.split(r'(?<=[.!?])\s+', statement)
-
-    # Restore the placeholders to their original form
-    sentences = [s.replace('__DOT__', '.') for s in sentences]
 
     processed_statements = []
-    for sentence in sentences:
+    for sentence in SENTENCE_BREAK.split(statement):
         sentence = sentence.strip()
-        if sentence and not sentence.endswith(('.', '!', '?')):
+        if sentence and not sentence.endswith(SENTENCE_ENDINGS):
             sentence += '.'  # Ensure it ends with a period
         processed_statements.append([category, sentence, file_path, file_name])
 
     return processed_statements
 
-def is_valid_date(date_str):
-    """Check if a date matches the format 'D Mmm YY' or 'DD Mmm YY' and is a real date."""
-    pattern = r"^\d{1,2} [A-Za-z]{3} \d{2}$"  # Allows 1 or 2 digits for the day
-    if not re.match(pattern, date_str):
-        return False
+DATE_PATTERN = re.compile(r"^(\d{1,2}) ([A-Za-z]{3}) (\d{2})$")  # Allows 1 or 2 digits for the day
+MONTHS = {month: number for number, month in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str):
+    """
+    Returns the date for a 'D Mmm YY' or 'DD Mmm YY' string, or None if it is not in that format
+    or not a real date. Two-digit years follow strptime's %y: 69-99 are 19xx, 00-68 are 20xx.
+    """
+    match = DATE_PATTERN.match(date_str)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    month = MONTHS.get(month.lower())
+    if month is None:
+        return None
+    year = int(year)
     try:
-        datetime.strptime(date_str, "%d %b %y")  # Validates real date
-        return True
+        return date(year + (1900 if year >= 69 else 2000), month, int(day))
     except ValueError:
-        return False
+        return None
+
+def is_valid_date(date_str):
+    """Check if a date matches the format 'D Mmm YY' or 'DD Mmm YY' and is a real date."""
+    return parse_date(date_str) is not None
 
 def remove_unwanted_text(category, statement):
     unwanted_text = IGNORE_TEXT.get(category, [])
@@ -347,210 +627,1220 @@ def remove_unwanted_text(category, statement):
         if truncation_point in statement:
             statement = statement.split(truncation_point)[0]  
 
-    statement = re.sub(r'\s+', ' ', statement).strip()  
-    return statement
+    return ' '.join(statement.split())  # Collapse runs of whitespace
 
-def save_to_csv(data, output_file):
-    # Ensure the header includes the additional fields
-    with open(output_file, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            "Category", "Statement", "file_path", "Name", "days_supervised", "days_non_rated", "duty_title", 
-            "dafsc", "reason", "period_start", "period_end", "org", "location", 
-            "ratee_signed", "rater_name", "rater_signed", "rater_duty_title", "HLR_name", 
-            "HLR_duty_title", "HLR_signed", "strat","promotion_rec", "future_role_1", "future_role_2", "future_role_3"
-        ])  # Add all headers here
-        writer.writerows(data)
-
-# Main script
-
-
-class PandasModel(QAbstractTableModel):
-	def __init__(self, df=pd.DataFrame(), parent=None):
-		super().__init__(parent)
-		self._df = df
-
-	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
-		if role != Qt.ItemDataRole.DisplayRole:
-			return QVariant()
-		if orientation == Qt.Orientation.Horizontal:
-			try:
-				return self._df.columns.tolist()[section]
-			except IndexError:
-				return QVariant()
-		elif orientation == Qt.Orientation.Vertical:
-			try:
-				return self._df.index.tolist()[section]
-			except IndexError:
-				return QVariant()
-
-	def rowCount(self, parent=QModelIndex()):
-		return self._df.shape[0]
-
-	def columnCount(self, parent=QModelIndex()):
-		return self._df.shape[1]
-
-	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
-		if role != Qt.ItemDataRole.DisplayRole:
-			return QVariant()
-		if not index.isValid():
-			return QVariant()
-		return QVariant(str(self._df.iloc[index.row(), index.column()]))
-
-
-
-class MyApp(QWidget):
-
-    def __init__(self, defaultSource=None):
-        super().__init__()
-        self.window_width, self.window_height = 1100, 500
-        self.resize(self.window_width, self.window_height)
-        self.setWindowTitle('CSV Data Viewer')
-        self.setWindowIcon(QIcon('./icon/browser.png'))
-        self.df = None
-        self.setStyleSheet("""
-            QWidget {
-                font-size: 15px;
-            }
-            QComboBox {
-                width: 160px;
-            }
-            QPushButton {
-                width: 100px;
-            }
-        """)
-
-        self.layout = QVBoxLayout()
-        self.setLayout(self.layout)
-
-        self.initUI(defaultSource)
-
-    def retrieveDataset(self):
-        try:
-            urlSource = self.dataSourceField.text()
-            self.df = pd.read_csv(urlSource)
-            self.df.fillna('')
-            self.model = PandasModel(self.df)
-            self.table.setModel(self.model)
-
-            self.comboColumns.clear()
-            self.comboColumns.addItems(self.df.columns)
-        except Exception as e:
-            self.statusLabel.setText(str(e))
-            return
+def parse_pdf_records(file_path, extraction="text"):
+    """
+    Returns the records of one PDF as a list together with its ParseStats as a dict, so both can be
+    sent back from a worker process.
+    """
+    stats = ParseStats(file_path)
+    records = list(parse_pdf(file_path, extraction, stats))
+    return records, stats.as_dict()
 
-    def searchItem(self, v):
-        if self.df is None:
-            return
+class ParseFailure(Exception):
+    """
+    A PDF that could not be parsed. The message is the reason it was quarantined, and kind is
+    "error" (the parser raised), "timeout", "memory" or "crash" (its worker process died).
+    """
 
-        column_index = self.df.columns.get_loc(self.comboColumns.currentText())
-        for row_index in range(self.model.rowCount()):
-            if v in self.model.index(row_index, column_index).data():
-                self.table.setRowHidden(row_index, False)
-            else:
-                self.table.setRowHidden(row_index, True)
+    def __init__(self, reason, kind="error"):
+        super().__init__(reason, kind)
+        self.reason = reason
+        self.kind = kind
 
-    def copy_to_clipboard(self):
+    def __str__(self):
+        return self.reason
+
+def as_failure(error, memory_mb=None):
+    """Returns the ParseFailure for a PDF whose parse raised error."""
+    if isinstance(error, ParseFailure):
+        return error
+    if isinstance(error, MemoryError):
+        return ParseFailure(f"Ran out of memory (budget {memory_mb} MB)" if memory_mb else "Ran out of memory", "memory")
+    return ParseFailure(f"{type(error).__name__}: {error}")
+
+ParseBudget = namedtuple("ParseBudget", ["timeout", "memory_mb"])  # Seconds and MB allowed per PDF, None for no limit
+
+def supervised_worker(connection, memory_mb=None):
+    """
+    Runs the (fn, args) jobs sent over connection one at a time and sends back each result, or a
+    ParseFailure, until it receives None. Where the platform allows it, the address space of the
+    process may grow by at most memory_mb beyond its size at startup.
+    """
+    if memory_mb and resource is not None:
+        in_use = address_space_bytes()
+        if in_use is not None:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            limit = in_use + memory_mb * 1024 * 1024
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    while True:
+        job = connection.recv()
+        if job is None:
+            return
+        fn, args = job
         try:
-            clipboard = QApplication.clipboard()
-            visible_rows = []
-
-            # Iterate over the rows and check if they are visible
-            for row_index in range(self.model.rowCount()):
-                if not self.table.isRowHidden(row_index):
-                    # Extract only the value of the "Statements" column (index 1)
-                    statement = str(self.model.data(self.model.index(row_index, 1)).value())  # Column 1 is for Statements
-                    visible_rows.append([statement])
-
-            if not visible_rows:
-                print("No visible rows to copy.")
-                return
+            result = fn(*args)
+        except Exception as e:  # MemoryError included
+            result = as_failure(e, memory_mb)
+        connection.send(result)
 
-            # Create CSV string for the Statements column
-            csv_data = "\n".join([row[0] for row in visible_rows])  # Only join the statements, not the whole row
+class SupervisedPool:
+    """
+    A process pool that can give up on a single job, with the submit and shutdown methods of
+    ProcessPoolExecutor. Each worker process runs one job at a time. A worker that runs past
+    timeout seconds is killed, as is one that dies (e.g. a crash inside MuPDF), and the next job
+    gets a fresh one; the job's future raises ParseFailure with the reason. Workers have a
+    memory budget of memory_mb each, see supervised_worker.
+    """
 
-            # Debug output to ensure data is correct
-            print("Statements to copy:", visible_rows)
-            
-            # Set the clipboard data
-            clipboard.setText(csv_data)
-            print("Statements copied to clipboard successfully.")
+    def __init__(self, max_workers, timeout=None, memory_mb=None):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.jobs = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.running = set()  # Worker processes with a job in progress
+        self.threads = [threading.Thread(target=self._supervise, daemon=True) for _ in range(max_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.put((future, fn, args))
+        return future
+
+    def _start_worker(self):
+        connection, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=supervised_worker, args=(child, self.memory_mb), daemon=True)
+        process.start()
+        child.close()
+        return process, connection
+
+    def _supervise(self):
+        """Feeds jobs to one worker process, replacing it after a job that failed, timed out or crashed."""
+        process = connection = None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if process is None:
+                process, connection = self._start_worker()
+            with self.lock:
+                self.running.add(process)
+            try:
+                connection.send((fn, args))
+                if connection.poll(self.timeout):
+                    result = connection.recv()
+                else:
+                    result = ParseFailure(f"Timed out after {self.timeout:g} s", "timeout")
+            except (EOFError, OSError):
+                process.join()
+                result = ParseFailure(f"Worker process died (exit code {process.exitcode})", "crash")
+            with self.lock:
+                self.running.discard(process)
+
+            if isinstance(result, ParseFailure):
+                process.kill()  # It may be stuck or short of memory
+                process.join()
+                connection.close()
+                process = connection = None
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        if process is not None:
+            connection.send(None)
+            process.join()
+            connection.close()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        if cancel_futures:
+            while True:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job[0].cancel()
+            with self.lock:
+                for process in self.running:
+                    process.kill()
+        for _ in self.threads:
+            self.jobs.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+class RunReport:
+    """
+    Collects the ParseStats of every PDF in a batch, plus the time spent saving the output, and
+    summarizes them or writes them out as a JSON report.
+    """
 
-        except Exception as e:
-            print(f"An error occurred while copying to clipboard: {e}")
-            
+    def __init__(self):
+        self.documents = []  # ParseStats.as_dict() of every parsed PDF
+        self.worker_peak = None  # Highest peak memory of a process that parsed a PDF, in MB
+        self.cached = 0
+        self.quarantined = []  # {"file_path", "reason"} of every PDF that could not be parsed
+        self.records = 0
+        self.producing = [0.0, 0.0]  # Wall and CPU seconds the writer spent waiting for records
+        self.save = [0.0, 0.0]
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+
+    def add(self, stats):
+        peak = stats.pop("process_peak_memory_mb", None)
+        if peak is not None:
+            self.worker_peak = max(peak, self.worker_peak or 0.0)
+        self.documents.append(stats)
+
+    def add_cached(self):
+        self.cached += 1
+
+    def add_quarantined(self, file_path, reason):
+        self.quarantined.append({"file_path": file_path, "reason": reason})
+
+    def produced(self, records):
+        """Passes records through, timing how long each one takes to arrive."""
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            record = next(records, None)
+            self.producing[0] += time.perf_counter() - wall
+            self.producing[1] += time.process_time() - cpu
+            if record is None:
+                return
+            yield record
+
+    def saved(self, count, wall, cpu):
+        """Records the writer's time for count records, less the time it spent waiting for them."""
+        self.records = count
+        self.save = [wall - self.producing[0], cpu - self.producing[1]]
+
+    def as_dict(self):
+        phases = {}
+        for stats in self.documents:
+            for name, times in stats["phases"].items():
+                totals = phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                totals["wall"] += times["wall"]
+                totals["cpu"] += times["cpu"]
+        phases["save"] = {"wall": self.save[0], "cpu": self.save[1]}
+        malformed = {}
+        for stats in self.documents:
+            for entry in stats["malformed"]:
+                malformed[entry["field"]] = malformed.get(entry["field"], 0) + 1
+        return {
+            "files": len(self.documents) + self.cached + len(self.quarantined),
+            "parsed": len(self.documents),
+            "cached": self.cached,
+            "quarantined": self.quarantined,
+            "pages": sum(stats["pages"] for stats in self.documents),
+            "records": self.records,
+            "wall": time.perf_counter() - self.wall,
+            "cpu": time.process_time() - self.cpu,
+            "phases": phases,
+            "malformed": malformed,
+            "peak_memory_mb": {"main": peak_memory_mb(), "workers": self.worker_peak},
+            "documents": self.documents,
+        }
+
+    def write(self, report_file):
+        with open(report_file, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def summary(self, slowest=5):
+        """Returns a few lines of totals, followed by the slowest PDFs."""
+        report = self.as_dict()
+        peak = report["peak_memory_mb"]["main"]
+        lines = [
+            f"Parsed {report['parsed']} PDFs ({report['pages']} pages, {report['cached']} more from the cache), "
+            f"{report['records']} records in {report['wall']:.2f} s"
+            + (f", peak memory {peak:.0f} MB" if peak is not None else ""),
+            "Time per phase: " + ", ".join(f"{name} {times['wall']:.2f} s" for name, times in report["phases"].items()),
+        ]
+        if self.quarantined:
+            lines.append(f"Quarantined {len(self.quarantined)} PDFs that could not be parsed")
+        if report["malformed"]:
+            lines.append("Malformed fields: " + ", ".join(f"{field} {count}" for field, count in report["malformed"].items()))
+        documents = sorted(self.documents, key=lambda stats: stats["wall"], reverse=True)[:slowest]
+        if documents:
+            lines.append("Slowest PDFs:")
+            lines.extend(f"  {stats['wall']:.3f} s  {stats['pages']} pages  {stats['file_path']}" for stats in documents)
+        return "\n".join(lines)
+
+BUFFERED_DOCUMENTS = 1000  # Finished PDFs whose records may wait for a slower PDF ahead of them
+
+def is_finished(job):
+    """Tells whether the records of a pending job in parse_pdfs can be taken without waiting."""
+    return not isinstance(job, Future) or job.done()
+
+def parse_pdfs(file_paths, workers=None, cache=None, progress=None, index=None, extraction="text", report=None,
+               budget=None, quarantined=None):
+    """
+    Yields the records of every PDF in file_paths, in the same order as file_paths.
+    Spreads the work across a pool of worker processes unless workers is 1 or less.
+    When a ParseCache is given, only new or modified PDFs are parsed.
+    When a SearchIndex is given, it is brought up to date with the new or modified PDFs.
+    Only a few documents per worker are being parsed at a time, so memory does not grow with the
+    batch; finished ones wait behind a slow PDF, up to BUFFERED_DOCUMENTS, so the other workers
+    keep going.
+    With a ParseBudget, every PDF is parsed in a SupervisedPool worker under its time and memory limits.
+    A PDF that raises, or breaks its budget, yields no records and is appended to quarantined, if
+    given, as (file_path, reason). The cache remembers it until the file changes, unless it timed
+    out or ran out of memory and a later run has a larger budget, or its worker crashed.
+    progress, if given, is called with (files done, total files) after each PDF.
+    The stats of every parsed PDF are added to report, if given.
+    The cache and index must have been opened with the same extraction mode.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    executor = None
+    if budget and file_paths:
+        executor = SupervisedPool(max(1, min(workers, len(file_paths))), budget.timeout, budget.memory_mb)
+    elif workers > 1 and len(file_paths) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(file_paths)))
+    max_pending = max(1, workers * 2)
+    done = 0
+
+    def finish(file_path, stat, job):
+        nonlocal done
+        failed = False
+        if isinstance(job, list):
+            statements = job  # Cached records
+            if report:
+                report.add_cached()
+        else:
+            try:
+                if isinstance(job, ParseFailure):
+                    raise job  # Quarantined on an earlier run
+                statements, stats = job.result() if job else parse_pdf_records(file_path, extraction)
+            except BrokenExecutor:
+                raise  # A worker died and took the pool with it; a ParseBudget isolates each PDF
+            except Exception as e:
+                statements, failed = [], True
+                failure = as_failure(e)
+                reason = failure.reason
+                if cache and not isinstance(job, ParseFailure):
+                    cache.put_failure(file_path, stat, failure, budget)
+                if quarantined is not None:
+                    quarantined.append((file_path, reason))
+                if report:
+                    report.add_quarantined(file_path, reason)
+            else:
+                if cache:
+                    cache.put(file_path, stat, statements)
+                if report:
+                    report.add(stats)
+        if index:
+            if failed:
+                index.remove(file_path)
+            else:
+                index.update(file_path, stat, statements)
+        done += 1
+        if progress:
+            progress(done, len(file_paths))
+        return statements
 
-    def initUI(self, defaultSource):
-        sourceLayout = QHBoxLayout()
-        self.layout.addLayout(sourceLayout)
+    pending = deque()
+    try:
+        for file_path in file_paths:
+            stat = stat_source(file_path)
+            job = cache.get_failure(file_path, stat, budget) if cache else None
+            if job is None and cache:
+                job = cache.get(file_path, stat)
+            if job is None and executor:
+                job = executor.submit(parse_pdf_records, file_path, extraction)
+            pending.append((file_path, stat, job))
+
+            # Results are consumed in submission order, so the output does not depend on the worker count.
+            # While the first pending PDF is still being parsed, the ones after it go ahead as workers free up
+            while pending:
+                if is_finished(pending[0][2]) or len(pending) >= BUFFERED_DOCUMENTS:
+                    yield from finish(*pending.popleft())
+                    continue
+                running = [job for _, _, job in pending if not is_finished(job)]
+                if len(running) < max_pending:
+                    break
+                wait(running, return_when=FIRST_COMPLETED)
+        while pending:
+            yield from finish(*pending.popleft())
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    if cache:
+        cache.prune(file_paths)
+        cache.commit()
+    if index:
+        index.prune(file_paths)
+        index.commit()
+
+CSV_HEADER = [
+    "Category", "Statement", "file_path", "Name", "days_supervised", "days_non_rated", "duty_title", 
+    "dafsc", "reason", "period_start", "period_end", "org", "location", 
+    "ratee_signed", "rater_name", "rater_signed", "rater_duty_title", "HLR_name", 
+    "HLR_duty_title", "HLR_signed", "strat","promotion_rec", "future_role_1", "future_role_2", "future_role_3"
+]
 
-        label = QLabel('&Data Source: ')
-        self.dataSourceField = QLineEdit(defaultSource)  # Default value set here
-        label.setBuddy(self.dataSourceField)
+class Interrupted(Exception):
+    """Raised by a tap to abandon a run, leaving the previous output and its sidecar files as they were."""
 
-        buttonRetrieve = QPushButton('&Retrieve', clicked=self.retrieveDataset)
-        buttonCopy = QPushButton('&Copy Statements', clicked=self.copy_to_clipboard)
+@contextmanager
+def temporary_output(output_file):
+    """
+    Yields a temporary path next to output_file to write to, which replaces output_file once the
+    block finishes. If it fails or is interrupted, the temporary file is removed instead.
+    """
+    temporary_file = output_file + ".tmp"
+    if os.path.exists(temporary_file):
+        os.remove(temporary_file)  # Left behind by a run that was killed
+    try:
+        yield temporary_file
+    except BaseException:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        raise
+    os.replace(temporary_file, output_file)
+
+def save_to_csv(records, output_file, flush_every=1000):
+    """
+    Writes records to output_file as they arrive from the iterable, flushing every flush_every rows,
+    and returns the number of rows written. output_file is only replaced once every record is written.
+    """
+    count = 0
+    with temporary_output(output_file) as temporary_file, open(temporary_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for record in records:
+            writer.writerow(record)
+            count += 1
+            if count % flush_every == 0:
+                file.flush()
+    return count
+
+# The SQLite output stores each PDF's fields once in documents, and its sentences in statements
+STATEMENT_COLUMNS = CSV_HEADER[:2]
+DOCUMENT_COLUMNS = CSV_HEADER[2:]
+SQLITE_EXTENSIONS = (".sqlite", ".db")
+
+def save_to_sqlite(records, output_file, commit_every=1000):
+    """
+    Writes records to a normalized SQLite file: one documents row per PDF with the document-level
+    fields and one statements row per sentence keyed by document_id. The statements_flat view
+    joins them back into the CSV layout. Returns the number of statements written.
+    output_file is only replaced once every record is written.
+    """
+    with temporary_output(output_file) as temporary_file:
+        connection = sqlite3.connect(temporary_file)
+        connection.executescript(
+            "CREATE TABLE documents (document_id INTEGER PRIMARY KEY, "
+            + ", ".join(f"{column} TEXT" for column in DOCUMENT_COLUMNS) + ");"
+            "CREATE TABLE statements (statement_id INTEGER PRIMARY KEY, "
+            "document_id INTEGER REFERENCES documents (document_id), "
+            + ", ".join(f"{column} TEXT" for column in STATEMENT_COLUMNS) + ");"
+            "CREATE INDEX statements_document ON statements (document_id);"
+            "CREATE VIEW statements_flat AS SELECT " + ", ".join(CSV_HEADER)
+            + " FROM statements JOIN documents USING (document_id) ORDER BY statement_id;"
+        )
+        insert_document = f"INSERT INTO documents ({', '.join(DOCUMENT_COLUMNS)}) VALUES ({', '.join('?' * len(DOCUMENT_COLUMNS))})"
+        insert_statement = f"INSERT INTO statements (document_id, {', '.join(STATEMENT_COLUMNS)}) VALUES (?, ?, ?)"
+
+        count = 0
+        current_file = None
+        document_id = None
+        try:
+            for record in records:
+                # Records of one PDF arrive together and share the document-level fields
+                if record[2] != current_file:
+                    current_file = record[2]
+                    document_id = connection.execute(insert_document, record[2:]).lastrowid
+                connection.execute(insert_statement, [document_id] + list(record[:2]))
+                count += 1
+                if count % commit_every == 0:
+                    connection.commit()
+            connection.commit()
+        finally:
+            connection.close()
+    return count
+
+def save_output(records, output_file):
+    """Writes records with the backend that matches output_file's extension, CSV unless it is SQLite."""
+    if output_file.lower().endswith(SQLITE_EXTENSIONS):
+        return save_to_sqlite(records, output_file)
+    return save_to_csv(records, output_file)
+
+def read_sqlite_records(sqlite_file):
+    """Yields the records of a normalized SQLite output in the flat CSV layout."""
+    connection = sqlite3.connect(sqlite_file)
+    try:
+        yield from connection.execute("SELECT * FROM statements_flat")
+    finally:
+        connection.close()
+
+def read_output_records(output_file):
+    """Yields the records of a CSV or SQLite output, without the CSV header."""
+    if output_file.lower().endswith(SQLITE_EXTENSIONS):
+        yield from read_sqlite_records(output_file)
+        return
+    with open(output_file, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+def export_csv(sqlite_file, output_csv):
+    """Writes the joined flat view of a SQLite output to a CSV file."""
+    return save_to_csv(read_sqlite_records(sqlite_file), output_csv)
+
+def index_path_for(output_file):
+    """Returns where the full-text index for output_file is kept."""
+    return os.path.splitext(output_file)[0] + "_index.sqlite"
+
+def fts_query(text):
+    """
+    Translates a search box query into an FTS5 query. Words must all match, "quoted words"
+    match as a phrase, a trailing * matches any word with that prefix, and AND, OR and NOT
+    are passed through as operators.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase:
+            terms.append('"' + phrase + '"')
+        elif word in ("AND", "OR", "NOT"):
+            terms.append(word)
+        else:
+            prefix = word.endswith("*")
+            word = word.rstrip("*").replace('"', '""')
+            if word:
+                terms.append('"' + word + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
 
-        sourceLayout.addWidget(label)
-        sourceLayout.addWidget(self.dataSourceField)
-        sourceLayout.addWidget(buttonRetrieve)
+class SearchIndex:
+    """
+    Inverted full-text index over the statements and their metadata, kept in an SQLite FTS5 table.
+    Each PDF's records are indexed under its size and modification time, so only new or
+    modified PDFs are re-indexed and a re-parsed PDF only replaces its own rows.
+    """
 
-        # search field
-        
-        searchLayout = QHBoxLayout()
-        self.layout.addLayout(searchLayout)
+    def __init__(self, index_file, extraction="text"):
+        self.index_file = index_file
+        self.signature = parser_signature(extraction)
+        self.connection = sqlite3.connect(index_file)
+        self.connection.execute("PRAGMA journal_mode=WAL")  # Lets the viewer search while the parser writes
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS files (file_path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, parser TEXT);"
+            "CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, file_path TEXT, seq INTEGER);"
+            "CREATE INDEX IF NOT EXISTS records_file ON records (file_path);"
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS statements USING fts5({', '.join(CSV_HEADER)}, tokenize='unicode61');"
+        )
+
+    def update(self, file_path, stat, records):
+        """Replaces the rows of file_path unless it was already indexed at this size and modification time."""
+        signature = (stat.st_size, stat.st_mtime_ns, self.signature)
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, parser FROM files WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        if row == signature:
+            return
+        self.remove(file_path)
+        (last_id,) = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM records").fetchone()
+        ids = range(last_id + 1, last_id + 1 + len(records))
+        self.connection.executemany(
+            "INSERT INTO records VALUES (?, ?, ?)", ((id, file_path, seq) for seq, id in enumerate(ids))
+        )
+        self.connection.executemany(
+            f"INSERT INTO statements (rowid, {', '.join(CSV_HEADER)}) VALUES (?{', ?' * len(CSV_HEADER)})",
+            ([id] + list(record) for id, record in zip(ids, records))
+        )
+        self.connection.execute("INSERT INTO files VALUES (?, ?, ?, ?)", (file_path,) + signature)
+
+    def remove(self, file_path):
+        self.connection.execute(
+            "DELETE FROM statements WHERE rowid IN (SELECT id FROM records WHERE file_path = ?)", (file_path,)
+        )
+        self.connection.execute("DELETE FROM records WHERE file_path = ?", (file_path,))
+        self.connection.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
+
+    def prune(self, file_paths):
+        """Drops the rows of files that are no longer part of the batch."""
+        keep = set(file_paths)
+        for (file_path,) in self.connection.execute("SELECT file_path FROM files").fetchall():
+            if file_path not in keep:
+                self.remove(file_path)
+
+    def search(self, text):
+        """
+        Returns (file_path, position of the record within that file) for every record matching the
+        query text, see fts_query.
+        """
+        return self.connection.execute(
+            "SELECT records.file_path, records.seq FROM statements JOIN records ON records.id = statements.rowid "
+            "WHERE statements MATCH ?", (fts_query(text),)
+        ).fetchall()
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        """Drops the changes made since the last commit."""
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+ZIP_SEPARATOR = "!"  # Between an archive's path and a member's name in the source path of a PDF in a zip archive
+
+SourceStat = namedtuple("SourceStat", ["st_size", "st_mtime_ns"])
+
+def split_source(source):
+    """Returns (archive path, member name) for a PDF inside a zip archive, or (source, None) for a file."""
+    position = source.lower().find(".zip" + ZIP_SEPARATOR)
+    if position < 0:
+        return source, None
+    split = position + len(".zip")
+    return source[:split], source[split + len(ZIP_SEPARATOR):]
+
+@lru_cache(maxsize=64)
+def zip_index(archive, size, mtime_ns):
+    """Returns {member name: ZipInfo} for an archive; size and mtime_ns make a changed archive be read again."""
+    with zipfile.ZipFile(archive) as zip_file:
+        return {info.filename: info for info in zip_file.infolist()}
+
+def stat_source(source):
+    """
+    Returns the size and modification time of a source. A PDF in a zip archive has its own size
+    and the archive's modification time.
+    """
+    archive, member = split_source(source)
+    stat = os.stat(archive)
+    if member is None:
+        return stat
+    return SourceStat(zip_index(archive, stat.st_size, stat.st_mtime_ns)[member].file_size, stat.st_mtime_ns)
+
+def read_source(source):
+    """Returns the bytes of a PDF inside a zip archive, straight from the archive."""
+    archive, member = split_source(source)
+    with zipfile.ZipFile(archive) as zip_file:
+        return zip_file.read(member)
+
+def open_document(source, stream=None):
+    """Opens a PDF file, a PDF inside a zip archive, or the PDF in stream, without writing anything to disk."""
+    if stream is None and split_source(source)[1] is not None:
+        stream = read_source(source)
+    if stream is not None:
+        return fitz.open(stream=stream, filetype="pdf")
+    return fitz.open(source)
+
+def content_digest(source, chunk_size=1 << 20):
+    """Returns the SHA-1 of a source's content."""
+    digest = hashlib.sha1()
+    archive, member = split_source(source)
+    if member is None:
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    else:
+        with zipfile.ZipFile(archive) as zip_file, zip_file.open(member) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def find_pdfs(directories, recursive=False):
+    """
+    Returns the PDFs in directories, and in their subfolders if recursive, sorted by path.
+    The PDFs inside .zip archives are included as "<archive>.zip!<member>", and are read from the
+    archive without extracting them.
+    """
+    pdf_files = []
+    pending = list(directories)
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                name = entry.name.lower()
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif name.endswith(".pdf"):
+                    pdf_files.append(entry.path)
+                elif name.endswith(".zip"):
+                    try:
+                        stat = entry.stat()
+                        members = zip_index(entry.path, stat.st_size, stat.st_mtime_ns)
+                    except (OSError, zipfile.BadZipFile) as e:
+                        print(f"Skipping {entry.path}: {e}")
+                        continue
+                    pdf_files.extend(entry.path + ZIP_SEPARATOR + member for member, info in members.items()
+                                     if not info.is_dir() and member.lower().endswith(".pdf"))
+    return sorted(pdf_files)
+
+def dedupe_sources(sources, cache=None):
+    """
+    Groups sources by content hash, so copies of one EPB are only parsed once. Returns
+    {content SHA-1: every source with that content, in the order of sources}; the first source of
+    each group is the one that is parsed and named in the output. Hashes are kept in the
+    ParseCache, if given, so unchanged files are not read again.
+    """
+    groups = {}
+    for source in sources:
+        stat = stat_source(source)
+        digest = cache.get_digest(source, stat) if cache else None
+        if digest is None:
+            digest = content_digest(source)
+            if cache:
+                cache.put_digest(source, stat, digest)
+        groups.setdefault(digest, []).append(source)
+    if cache:
+        cache.prune_digests(sources)
+    return groups
+
+def sources_path_for(output_file):
+    """Returns where the source paths of the documents in output_file are listed."""
+    return os.path.splitext(output_file)[0] + "_sources.csv"
+
+def save_sources(groups, sources_file):
+    """Writes one row per source: the document's content hash, the file_path it is output under, and the source."""
+    with open(sources_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["content_sha1", "file_path", "source_path"])
+        for digest, sources in groups.items():
+            writer.writerows([digest, sources[0], source] for source in sources)
 
-        label = QLabel('&Search: ')
-        self.searchField = QLineEdit()
-        self.searchField.textChanged.connect(self.searchItem)
-        label.setBuddy(self.searchField)
-        searchLayout.addWidget(label)
-        searchLayout.addWidget(self.searchField)
-        searchLayout.addWidget(buttonCopy)
+def quarantine_path_for(output_file):
+    """Returns where the PDFs left out of output_file, and why, are listed."""
+    return os.path.splitext(output_file)[0] + "_quarantine.csv"
 
-        self.comboColumns = QComboBox()
-        
-        searchLayout.addWidget(self.comboColumns)
+def save_quarantine(quarantined, quarantine_file):
+    with open(quarantine_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["file_path", "reason"])
+        writer.writerows(quarantined)
 
-        self.table = QTableView()
-        self.table.setSortingEnabled(True)
-        self.table.horizontalHeader().setSectionsMovable(True)
-        self.layout.addWidget(self.table)
+def read_sources(sources_file):
+    """Returns {source path: file_path it is output under} from a sources file, {} if there is none."""
+    try:
+        with open(sources_file, newline='') as file:
+            return {row["source_path"]: row["file_path"] for row in csv.DictReader(file)}
+    except FileNotFoundError:
+        return {}
 
-        self.statusLabel = QLabel()
-        self.statusLabel.setText('')
-        self.layout.addWidget(self.statusLabel)
+def write_output(pdf_files, output_file, workers=None, cache=None, index=None, extraction="text",
+                 progress=None, tap=None, report=None, budget=None, replaced=None):
+    """
+    Parses pdf_files into output_file with an already open cache and index, timing the run into
+    report if given. Copies of the same document are parsed once, under the first of their paths;
+    every path is listed in the sources file next to the output. PDFs that could not be parsed, or
+    broke the ParseBudget, are listed in the quarantine file. Returns the record count.
+    replaced, if given, is a set of file paths whose records changed; the file_path a document
+    was output under before and after is added to it when a copy sorting first was added or
+    removed, before any record is written.
+    """
+    groups = dedupe_sources(pdf_files, cache)
+    sources_file = sources_path_for(output_file)
+    if replaced is not None:
+        before = read_sources(sources_file)
+        after = {source: sources[0] for sources in groups.values() for source in sources}
+        for source in before.keys() | after.keys():
+            if before.get(source) != after.get(source):
+                replaced.update(path for path in (before.get(source), after.get(source)) if path is not None)
+    if len(groups) < len(pdf_files):
+        print(f"Skipping {len(pdf_files) - len(groups)} duplicate copies of {len(groups)} documents, "
+              f"see {sources_file}")
+    quarantined = []
+    records = parse_pdfs([sources[0] for sources in groups.values()], workers, cache, progress, index, extraction,
+                         report, budget, quarantined)
+    stream = report.produced(records) if report else records
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        count = save_output(tap(stream) if tap else stream, output_file)
+    finally:
+        records.close()
+    if report:
+        report.saved(count, time.perf_counter() - wall, time.process_time() - cpu)
+    save_sources(groups, sources_file)
+    save_quarantine(quarantined, quarantine_path_for(output_file))
+    for file_path, reason in quarantined:
+        print(f"Quarantined {file_path}: {reason}")
+    return count
+
+def run_batch(pdf_files, output_file, workers=None, cache_file=None, index_file=None, extraction="text",
+              progress=None, tap=None, report_file=None, budget=None):
+    """
+    Parses pdf_files into output_file, updating the parse cache and search index when their files
+    are given, and returns the number of records written. tap, if given, wraps the record stream
+    on its way to the writer. Prints a summary of where the time went, and writes the full
+    RunReport to report_file if given. With a ParseBudget, each PDF is parsed in supervised mode.
+    """
+    cache = ParseCache(cache_file, extraction) if cache_file else None
+    index = SearchIndex(index_file, extraction) if index_file else None
+    report = RunReport()
+    try:
+        count = write_output(pdf_files, output_file, workers, cache, index, extraction, progress, tap, report,
+                             budget)
+    finally:
+        if cache:
+            print(cache.summary())
+            cache.close()
+        if index:
+            index.close()
+    print(report.summary())
+    if report_file:
+        report.write(report_file)
+    print(f"Parsing complete. Results saved to {output_file}")
+    return count
+
+SHARD_FORMAT = "EPBScraper shard 1"
+
+def shard_of(digest, shards):
+    """Returns which of shards (numbered from 1) the document with this content hash belongs to."""
+    return int(digest, 16) % shards + 1
+
+def shard_path_for(output_file, shard, shards):
+    """Returns where shard of shards writes its partial output, for a run whose final output is output_file."""
+    return os.path.splitext(output_file)[0] + f"_shard{shard}of{shards}.jsonl"
+
+def save_shard(header, documents, records, quarantined, shard_file):
+    """
+    Writes a partial output: a JSON header line, then one line per document of documents, each
+    (position in the corpus, content hash, sources), with its records taken from the record stream
+    parse_pdfs yields for their first sources. The file only appears once it is complete.
+    Returns the record count.
+    """
+    count = 0
+    record = next(records, None)
+    with temporary_output(shard_file) as temporary_file, open(temporary_file, "w") as f:
+        f.write(json.dumps(header) + "\n")
+        for order, digest, sources in documents:
+            file_path = sources[0]
+            statements = []
+            # Records arrive grouped by document and in document order; a PDF may have none
+            while record is not None and record[2] == file_path:
+                statements.append(record)
+                record = next(records, None)
+            stat = stat_source(file_path)
+            f.write(json.dumps({
+                "order": order, "content_sha1": digest, "file_path": file_path, "sources": sources,
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "failure": dict(quarantined).get(file_path), "records": statements,
+            }) + "\n")
+            count += len(statements)
+    return count
+
+def run_shard(pdf_files, shard_file, shard, shards, workers=None, cache_file=None, extraction="text",
+              report_file=None, budget=None):
+    """
+    Parses only the documents of pdf_files that belong to shard of shards into the partial output
+    shard_file, see save_shard. Documents are assigned by content hash, so every shard run over the
+    same corpus, on any machine, agrees on the split, and copies of a document land in one shard.
+    Combine the partial outputs with merge_shards. Returns the record count.
+    """
+    cache = ParseCache(cache_file, extraction) if cache_file else None
+    report = RunReport()
+    try:
+        groups = dedupe_sources(pdf_files, cache)
+        documents = [(order, digest, sources) for order, (digest, sources) in enumerate(groups.items())
+                     if shard_of(digest, shards) == shard]
+        print(f"Shard {shard}/{shards}: {len(documents)} of {len(groups)} documents")
+        header = {
+            "format": SHARD_FORMAT, "shard": shard, "shards": shards, "assigned_by": "content_sha1",
+            "parser": parser_signature(extraction), "extraction": extraction, "columns": CSV_HEADER,
+            "documents": len(documents), "corpus_documents": len(groups), "corpus_sources": len(pdf_files),
+            "host": platform.node(), "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        quarantined = []
+        records = parse_pdfs([sources[0] for _, _, sources in documents], workers, cache, extraction=extraction,
+                             report=report, budget=budget, quarantined=quarantined)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            count = save_shard(header, documents, report.produced(records), quarantined, shard_file)
+        finally:
+            records.close()
+        report.saved(count, time.perf_counter() - wall, time.process_time() - cpu)
+    finally:
+        if cache:
+            print(cache.summary())
+            cache.close()
+    for file_path, reason in quarantined:
+        print(f"Quarantined {file_path}: {reason}")
+    print(report.summary())
+    if report_file:
+        report.write(report_file)
+    print(f"Shard {shard}/{shards} saved to {shard_file}")
+    return count
+
+def read_shard(shard_file):
+    """
+    Returns the header of a partial output written by run_shard, and an iterator over its
+    documents that raises ValueError if the file turns out to be truncated. The file is only open
+    while the iterator is being read; closing the iterator closes it.
+    """
+    with open(shard_file) as f:
+        try:
+            header = json.loads(f.readline() or "null")
+        except ValueError:
+            header = None
+    if not isinstance(header, dict) or header.get("format") != SHARD_FORMAT:
+        raise ValueError(f"{shard_file} is not a shard output")
+
+    def documents():
+        count = 0
+        with open(shard_file) as f:
+            f.readline()  # The header
+            for line in f:
+                try:
+                    document = json.loads(line)
+                except ValueError:
+                    raise ValueError(f"{shard_file} is cut off after {count} of its {header['documents']} documents") from None
+                count += 1
+                yield document
+        if count != header["documents"]:
+            raise ValueError(f"{shard_file} holds {count} of its {header['documents']} documents")
+    return header, documents()
+
+def merge_shards(shard_files, output_file, index_file=None):
+    """
+    Combines the partial outputs of run_shard into output_file (CSV or SQLite, see save_output),
+    in the order one run over the whole corpus would have written them, and writes the sources and
+    quarantine files next to it. Shards 1 to N must all be given, written by the same parser for
+    the same corpus. A document found in more than one partial output, for instance one passed
+    twice, is written once. Updates the SearchIndex in index_file, if given.
+    Nothing is changed if a partial output turns out to be cut off: output_file is only replaced,
+    and the index updates committed, once every document was read.
+    Returns (records written, documents, duplicate documents dropped).
+    """
+    parts = [read_shard(shard_file) for shard_file in shard_files]
+    if not parts:
+        raise ValueError("No shard outputs given")
+    first = parts[0][0]
+    for (header, _), shard_file in zip(parts, shard_files):
+        for key in ("shards", "parser", "corpus_documents"):
+            if header[key] != first[key]:
+                raise ValueError(f"{shard_file} has {key} {header[key]!r} but {shard_files[0]} has {first[key]!r}")
+    missing = set(range(1, first["shards"] + 1)).difference(header["shard"] for header, _ in parts)
+    if missing:
+        raise ValueError(f"Shard {', '.join(map(str, sorted(missing)))} of {first['shards']} not given")
+
+    groups = {}  # Content hash -> sources, in output order
+    quarantined = []
+    duplicates = 0
+    index = SearchIndex(index_file, first["extraction"]) if index_file else None
+
+    def merged_records():
+        nonlocal duplicates
+        # Each partial output is already in corpus order, so a k-way merge restores the full order
+        for document in heapq.merge(*(documents for _, documents in parts),
+                                    key=lambda document: (document["order"], document["content_sha1"])):
+            sources = groups.get(document["content_sha1"])
+            if sources is not None:
+                duplicates += 1
+                sources.extend(source for source in document["sources"] if source not in sources)
+                continue
+            groups[document["content_sha1"]] = list(document["sources"])
+            file_path = document["file_path"]
+            if document["failure"] is not None:
+                quarantined.append((file_path, document["failure"]))
+                if index:
+                    index.remove(file_path)
+            elif index:
+                index.update(file_path, SourceStat(document["size"], document["mtime_ns"]), document["records"])
+            yield from document["records"]
 
-        # Automatically call the retrieveDataset function after UI is initialized
-        self.retrieveDataset()
+    try:
+        count = save_output(merged_records(), output_file)
+        if index:
+            index.prune([sources[0] for sources in groups.values()])
+    except BaseException:
+        if index:
+            index.rollback()
+        raise
+    finally:
+        for _, documents in parts:
+            documents.close()
+        if index:
+            index.close()
+    save_sources(groups, sources_path_for(output_file))
+    save_quarantine(quarantined, quarantine_path_for(output_file))
+    return count, len(groups), duplicates
+
+class FolderWatcher:
+    """
+    Tracks the PDFs in a set of folders between calls to poll. A new or modified PDF is only
+    reported once its size and modification time have stayed the same for settle seconds, so
+    files that are still being copied in are not parsed half-written. When watchdog is installed
+    its file system events (inotify on Linux) wake the watcher up right away, otherwise the
+    folders are polled.
+    """
 
-if __name__ == '__main__':
-    script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
-    output_csv = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "output.csv")
-    
+    def __init__(self, directories, recursive=False, settle=2.0):
+        self.directories = directories
+        self.recursive = recursive
+        self.settle = settle
+        self.known = self.snapshot()  # file_path -> (size, mtime_ns) of the last reported version
+        self.pending = {}  # file_path -> ((size, mtime_ns), when that version was first seen)
+        self.changed = set()
+        self.removed = set()
+        self.event = threading.Event()
+        self.observer = self._start_observer()
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+        handler = FileSystemEventHandler()
+        handler.on_any_event = lambda event: self.event.set()
+        observer = Observer()
+        for directory in self.directories:
+            observer.schedule(handler, directory, recursive=self.recursive)
+        observer.start()
+        return observer
+
+    def snapshot(self):
+        """Returns file_path -> (size, mtime_ns) for every PDF currently in the folders."""
+        files = {}
+        for file_path in find_pdfs(self.directories, self.recursive):
+            try:
+                stat = stat_source(file_path)
+            except (FileNotFoundError, KeyError):
+                continue  # Deleted between the listing and the stat
+            files[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self):
+        """
+        Returns (changed, removed): the PDFs added or modified and the PDFs deleted since the last
+        report. Nothing is reported while a PDF is still being written, so files copied in
+        together are picked up in one update.
+        """
+        now = time.monotonic()
+        current = self.snapshot()
+        for file_path, version in current.items():
+            if self.known.get(file_path) == version:
+                self.pending.pop(file_path, None)
+                continue
+            seen = self.pending.get(file_path)
+            if seen is None or seen[0] != version:
+                self.pending[file_path] = (version, now)
+            elif now - seen[1] >= self.settle:
+                del self.pending[file_path]
+                self.known[file_path] = version
+                self.changed.add(file_path)
+                self.removed.discard(file_path)
+        for file_path in set(self.known).difference(current):
+            del self.known[file_path]
+            self.changed.discard(file_path)
+            self.removed.add(file_path)
+        for file_path in set(self.pending).difference(current):
+            del self.pending[file_path]
+
+        if self.pending:
+            return set(), set()
+        changed, removed = self.changed, self.removed
+        self.changed, self.removed = set(), set()
+        return changed, removed
+
+    def wait(self, timeout):
+        """Sleeps until the next poll: up to timeout seconds, less if watchdog reports a change."""
+        if self.pending:
+            time.sleep(self.settle)  # Nothing can be reported before the pending files settle
+        else:
+            self.event.wait(timeout)
+        self.event.clear()
 
-    all_statements = []
-    for pdf_file in os.listdir(script_dir):
-        if pdf_file.endswith(".pdf"):
-            file_path = os.path.join(script_dir, pdf_file)
-            statements = parse_pdf(file_path)
-            all_statements.extend(statements)
-
-    save_to_csv(all_statements, output_csv)
-
-    app = QApplication(sys.argv)
-    app.setStyleSheet('''
-		QWidget {
-			font-size: 17px;
-		}
-	''')
-	
-    myApp = MyApp(output_csv)
-    myApp.show()
+    def close(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
 
+def watch(directories, output_file, recursive=False, workers=None, cache_file=None, index_file=None,
+          extraction="text", interval=2.0, settle=2.0, progress=None, tap=None, ready=None, on_update=None,
+          stop=None, report_file=None, budget=None):
+    """
+    Writes output_file for the PDFs in directories, then keeps it up to date as PDFs are added,
+    modified or removed, until stop() returns True or the process is interrupted.
+    Unchanged PDFs come from the parse cache, which is kept in memory when no cache_file is given,
+    so each update only parses the affected files.
+    progress and tap apply to the first pass as in run_batch, after which ready is called with the
+    record count. on_update is called after every later update with (the file paths whose records
+    were replaced or removed, the new records under those paths, the record count).
+    The RunReport of the latest pass is written to report_file if given. With a ParseBudget, each
+    PDF is parsed in supervised mode.
+    """
+    watcher = FolderWatcher(directories, recursive, settle)
+    cache = ParseCache(cache_file or ":memory:", extraction)
+    index = SearchIndex(index_file, extraction) if index_file else None
     try:
-        sys.exit(app.exec())
-    except SystemExit:
-        print('Closing Window...')
+        report = RunReport()
+        count = write_output(sorted(watcher.known), output_file, workers, cache, index, extraction, progress, tap,
+                             report, budget)
+        print(cache.summary())
+        print(report.summary())
+        if report_file:
+            report.write(report_file)
+        print(f"Results saved to {output_file}. Watching {', '.join(directories)} for changes...")
+        if ready:
+            ready(count)
+
+        while not (stop and stop()):
+            watcher.wait(interval)
+            changed, removed = watcher.poll()
+            if not (changed or removed):
+                continue
+            updated = []
+            replaced = changed | removed  # write_output adds documents now output under another copy's path
+
+            def collect(records):
+                for record in records:
+                    if record[2] in replaced:
+                        updated.append(record)
+                    yield record
+
+            report = RunReport()
+            try:
+                count = write_output(sorted(watcher.known), output_file, workers, cache, index, extraction,
+                                     tap=collect, report=report, budget=budget, replaced=replaced)
+            except Exception as e:
+                print(f"Could not update {output_file}: {e}")
+                continue
+            if report_file:
+                report.write(report_file)
+            print(f"{len(changed)} PDFs added or modified, {len(removed)} removed. "
+                  f"{count} records saved to {output_file}")
+            if on_update:
+                on_update(replaced, updated, count)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        cache.close()
+        if index:
+            index.close()
+
+def shard_spec(text):
+    """Reads a --shard value such as 2/4 into (2, 4)."""
+    match = re.fullmatch(r"(\d+)/(\d+)", text.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"expected K/N with 1 <= K <= N, such as 2/4, got '{text}'")
+    return int(match.group(1)), int(match.group(2))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrapes EPB PDFs into output.csv and opens the viewer.")
+    parser.add_argument("inputs", nargs="*", metavar="DIRECTORY",
+                        help="folders to scan for PDFs (default: the folder the script is in)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="also scan subfolders")
+    parser.add_argument("--headless", action="store_true",
+                        help="parse and write the output without opening the viewer (no display or Qt needed)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes used to parse PDFs (1 parses serially, default: %(default)s)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and update the output as PDFs are added, modified or removed")
+    parser.add_argument("--poll-interval", type=float, default=2.0, metavar="SECONDS",
+                        help="how often --watch rescans the folders (default: %(default)s)")
+    parser.add_argument("--settle", type=float, default=2.0, metavar="SECONDS",
+                        help="how long a PDF must stay unchanged before --watch parses it (default: %(default)s)")
+    parser.add_argument("--supervised", action="store_true",
+                        help="parse each PDF in an isolated worker under a time and memory budget, and quarantine "
+                             "PDFs that fail or break it instead of stopping the run")
+    parser.add_argument("--timeout", type=float, default=30.0, metavar="SECONDS",
+                        help="time budget per PDF in --supervised mode (default: %(default)s)")
+    parser.add_argument("--memory-limit", type=int, default=1024, metavar="MB",
+                        help="memory budget per PDF in --supervised mode, where the platform supports it "
+                             "(default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the parse cache and re-parse every PDF")
+    parser.add_argument("--extraction", choices=EXTRACTION_MODES, default="text",
+                        help="how text is read from each page: 'text' in content order, or 'blocks' sorted "
+                             "top to bottom, left to right (default: %(default)s)")
+    parser.add_argument("-o", "--output",
+                        help="output file; a .sqlite or .db extension writes separate document and statement tables "
+                             "instead of a flat CSV (default: output.csv next to the script)")
+    parser.add_argument("--no-index", action="store_true", help="do not update the full-text search index")
+    parser.add_argument("--report", metavar="FILE",
+                        help="where to write the JSON run report with per-file and per-phase timings "
+                             "(default: <output>_report.json)")
+    parser.add_argument("--find-duplicates", action="store_true",
+                        help="after a --headless run, write groups of near-duplicate statements to "
+                             "<output>_duplicates.csv")
+    parser.add_argument("--similarity", type=float, default=0.7,
+                        help="how similar (0-1) statements must be for --find-duplicates to group them "
+                             "(default: %(default)s)")
+    parser.add_argument("--export-csv", metavar="SQLITE_FILE",
+                        help="write the joined statements of a SQLite output to the --output CSV and exit")
+    parser.add_argument("--shard", type=shard_spec, metavar="K/N",
+                        help="parse only shard K of N of the PDFs, assigned by content hash, into "
+                             "<output>_shardKofN.jsonl for --merge (implies --headless)")
+    parser.add_argument("--merge", nargs="+", metavar="SHARD_FILE",
+                        help="combine the partial outputs of every --shard into --output and exit")
+    args = parser.parse_args(argv)
+    if args.shard and args.watch:
+        parser.error("--shard cannot be combined with --watch")
+    missing = [directory for directory in args.inputs if not os.path.isdir(directory)]
+    if missing:
+        parser.error(f"not a folder: {', '.join(missing)}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
 
-print(f"Parsing complete. Results saved to {output_csv}")
\ No newline at end of file
+    script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+    output_file = os.path.abspath(args.output or os.path.join(script_dir, "output.csv"))
+    if args.export_csv:
+        print(f"Exported {export_csv(args.export_csv, output_file)} statements to {output_file}")
+        return 0
+    index_file = None if args.no_index else index_path_for(output_file)
+    if args.merge:
+        try:
+            count, documents, duplicates = merge_shards(args.merge, output_file, index_file)
+        except (OSError, ValueError) as e:
+            print(f"Could not merge: {e}")
+            return 1
+        print(f"Merged {documents} documents ({count} records) from {len(args.merge)} shard outputs into "
+              f"{output_file}" + (f", skipping {duplicates} duplicate documents" if duplicates else ""))
+        return 0
+
+    cache_file = None if args.no_cache else os.path.join(os.path.dirname(output_file), "parse_cache.sqlite")
+    report_file = args.report or os.path.splitext(output_file)[0] + "_report.json"
+    directories = args.inputs or [script_dir]
+    budget = ParseBudget(args.timeout, args.memory_limit) if args.supervised else None
+
+    if args.shard:
+        shard, shards = args.shard
+        shard_file = shard_path_for(output_file, shard, shards)
+        if cache_file:
+            # Shards running side by side each keep their own cache, which only holds their own PDFs
+            cache_file = os.path.splitext(cache_file)[0] + f"_shard{shard}of{shards}.sqlite"
+        run_shard(find_pdfs(directories, args.recursive), shard_file, shard, shards, args.workers, cache_file,
+                  args.extraction, args.report or os.path.splitext(shard_file)[0] + "_report.json", budget)
+        return 0
+
+    if args.headless and args.watch:
+        watch(directories, output_file, args.recursive, args.workers, cache_file, index_file, args.extraction,
+              args.poll_interval, args.settle, report_file=report_file, budget=budget)
+        return 0
+
+    pdf_files = find_pdfs(directories, args.recursive)
+    if args.headless:
+        run_batch(pdf_files, output_file, args.workers, cache_file, index_file, args.extraction,
+                  report_file=report_file, budget=budget)
+        if args.find_duplicates:
+            # numpy is only needed for this stage
+            from EPBDuplicates import duplicate_groups, duplicates_path_for, save_duplicates
+            groups = duplicate_groups(read_output_records(output_file), args.similarity)
+            duplicates_file = duplicates_path_for(output_file)
+            count = save_duplicates(groups, duplicates_file)
+            print(f"Found {len(groups)} groups of near-duplicate statements ({count} statements), "
+                  f"saved to {duplicates_file}")
+        return 0
+
+    # Qt and pandas are only loaded when the viewer is actually shown
+    from EPBViewer import run_viewer
+    return run_viewer(pdf_files, output_file, args.workers, cache_file, index_file, args.extraction,
+                      watch_directories=directories if args.watch else None, recursive=args.recursive,
+                      interval=args.poll_interval, settle=args.settle, report_file=report_file, budget=budget)
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Needed for the process pool in frozen (PyInstaller) builds
+    sys.exit(main())
@@ -0,0 +1,782 @@
+"""
+The viewer window: shows the scraped statements in a searchable table while the PDFs are parsed.
+Started by EPBScraper.py unless it is run with --headless.
+"""
+import os
+import sys
+import time
+import sqlite3
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from PyQt6.QtWidgets import QApplication, QWidget, QComboBox, QLineEdit, QTableView, QPushButton, QLabel, \
+							QCheckBox, QHBoxLayout, QVBoxLayout, QDialog, QDialogButtonBox, QFileDialog, QListWidget, \
+							QListWidgetItem
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QIcon
+
+from EPBDataset import COUNT_COLUMNS, DATE_COLUMNS, EXPORT_FORMATS, display_strings, load_dataset, query_mask, sortable_date, \
+					   typed_frame, write_rows
+from EPBDuplicates import find_duplicates
+from EPBScraper import CSV_HEADER, SQLITE_EXTENSIONS, Interrupted, SearchIndex, index_path_for, run_batch, watch
+
+
+class PandasModel(QAbstractTableModel):
+	"""
+	Table model over a DataFrame. Every column is converted once to a list of display strings and
+	the headers are cached, so painting a cell is two list lookups.
+	Sorting and filtering only rearrange the list of data rows that are displayed.
+	"""
+	def __init__(self, df=None, parent=None):
+		super().__init__(parent)
+		if df is None:
+			df = pd.DataFrame()
+		self._df = df
+		self._pending = []  # Rows appended since the DataFrame was last rebuilt
+		self._headers = [str(column) for column in df.columns]
+		self._index = df.index.tolist()
+		self._columns = [display_strings(df.iloc[:, column]) for column in range(df.shape[1])]
+		self._series = {}  # Column -> Series of display strings, built on first search
+		self._order = np.arange(df.shape[0])  # Data rows in sort order
+		self._filter = None  # (column, text) of the active search
+		self._mask = None  # Data rows that match the active search
+		self._restriction = None  # Data rows that may be shown at all, e.g. only duplicated statements
+		self._rows = self._order.tolist()  # Display row -> data row
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole:
+			return None
+		try:
+			if orientation == Qt.Orientation.Horizontal:
+				return self._headers[section]
+			return self._index[self._rows[section]]
+		except IndexError:
+			return None
+
+	def rowCount(self, parent=QModelIndex()):
+		return len(self._rows)
+
+	def columnCount(self, parent=QModelIndex()):
+		return len(self._headers)
+
+	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+			return None
+		return self._columns[index.column()][self._rows[index.row()]]
+
+	def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+		"""Sorts rows by the underlying values of column, so numeric columns sort numerically."""
+		if not 0 <= column < len(self._headers):
+			return
+		values = self.dataFrame().iloc[:, column].reset_index(drop=True)
+		ascending = order == Qt.SortOrder.AscendingOrder
+		try:
+			ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+		except TypeError:
+			# Mixed types, e.g. numbers read from a CSV next to strings appended by the parser
+			ordered = pd.Series(self._columns[column]).sort_values(ascending=ascending, kind="stable")
+		self.layoutAboutToBeChanged.emit()
+		self._order = ordered.index.to_numpy()
+		self._rows = self._visibleRows()
+		self.layoutChanged.emit()
+
+	def setFilter(self, column, text):
+		"""
+		Shows only the rows whose column contains text, matched in one vectorized pass.
+		When text extends the previous search on the same column, only the rows that already
+		matched are searched again.
+		"""
+		if not text or not 0 <= column < len(self._headers):
+			mask = None
+		elif self._filter and self._filter[0] == column and self._filter[1] in text:
+			candidates = np.flatnonzero(self._mask)
+			mask = np.zeros(len(self._index), dtype=bool)
+			mask[candidates[self._matches(column, text, candidates)]] = True
+		else:
+			mask = self._matches(column, text)
+		self._setMask(mask, (column, text) if mask is not None else None)
+
+	def setFilterMask(self, mask):
+		"""Shows only the data rows set in mask, e.g. the rows matching a query."""
+		self._setMask(mask, None)
+
+	def setFilterRecords(self, keys):
+		"""Shows only the rows whose (file_path, position within the file) is in keys."""
+		self._setMask(self.recordKeys().isin(keys), None)
+
+	def setRestriction(self, mask):
+		"""Limits the table to the data rows set in mask, on top of any search. None shows every row again."""
+		self.beginResetModel()
+		self._restriction = mask
+		self._rows = self._visibleRows()
+		self.endResetModel()
+
+	def columnValues(self, name):
+		"""Returns the display strings of the named column for every data row."""
+		return self._columns[self._headers.index(name)]
+
+	def matchCount(self):
+		"""Returns the number of rows matching the search."""
+		return len(self._rows)
+
+	def recordKeys(self):
+		"""Returns the (file_path, position within the file) of every data row."""
+		file_paths = pd.Series(self._columns[self._headers.index("file_path")])
+		return pd.MultiIndex.from_arrays([file_paths, file_paths.groupby(file_paths, sort=False).cumcount()])
+
+	def _setMask(self, mask, search):
+		self.beginResetModel()
+		self._filter = search
+		self._mask = mask
+		self._rows = self._visibleRows()
+		self.endResetModel()
+
+	def _matches(self, column, text, rows=None):
+		"""Returns a boolean array telling which rows (all rows by default) contain text in column."""
+		series = self._series.get(column)
+		if series is None:
+			series = self._series[column] = pd.Series(self._columns[column], dtype=object)
+		if rows is not None:
+			series = series.iloc[rows]
+		return series.str.contains(text, regex=False).to_numpy(dtype=bool)
+
+	def rowChunks(self, names, size=10000):
+		"""
+		Yields the rows shown, in display order, as lists of tuples of the named columns' display
+		strings, size rows at a time.
+		"""
+		columns = [np.asarray(self._columns[self._headers.index(name)], dtype=object) for name in names]
+		rows = np.asarray(self._rows, dtype=np.intp)
+		for start in range(0, len(rows), size):
+			chunk = rows[start:start + size]
+			yield list(zip(*(values[chunk] for values in columns)))
+
+	def _visibleRows(self):
+		mask = self._mask
+		if self._restriction is not None:
+			mask = self._restriction if mask is None else mask & self._restriction
+		if mask is None:
+			return self._order.tolist()
+		return self._order[mask[self._order]].tolist()
+
+	def dataFrame(self):
+		"""Returns the DataFrame behind the model, including any rows appended since it was built."""
+		if self._pending:
+			appended = typed_frame(pd.DataFrame(self._pending, columns=self._df.columns))
+			# Categories that only occur in one of the frames turn the column back to strings, so retype it
+			self._df = typed_frame(pd.concat([self._df, appended], ignore_index=True)) if len(self._df) else appended
+			self._pending = []
+		return self._df
+
+	def removeFiles(self, file_paths):
+		"""Removes the rows of the given files, keeping the order and search of the remaining rows."""
+		file_column = pd.Series(self._columns[self._headers.index("file_path")], dtype=object)
+		keep = ~file_column.isin(file_paths).to_numpy()
+		if keep.all():
+			return
+		positions = np.flatnonzero(keep)
+		renumbered = np.cumsum(keep) - 1  # Old data row -> new data row
+		self.beginResetModel()
+		self._df = self.dataFrame().iloc[positions].reset_index(drop=True)
+		self._columns = [np.array(values, dtype=object)[positions].tolist() for values in self._columns]
+		self._index = list(range(len(positions)))
+		self._series = {}
+		self._order = renumbered[self._order[keep[self._order]]]
+		if self._mask is not None:
+			self._mask = self._mask[keep]
+		if self._restriction is not None:
+			self._restriction = self._restriction[keep]
+		self._rows = self._visibleRows()
+		self.endResetModel()
+
+	def appendRows(self, rows):
+		"""Appends a batch of records to the end of the table, applying the active search to them."""
+		if not rows:
+			return
+		first = len(self._index)
+		new_rows = np.arange(first, first + len(rows))
+		for column, values in enumerate(self._columns):
+			values.extend("" if row[column] is None else str(row[column]) for row in rows)
+		self._series = {}
+		self._index.extend(new_rows.tolist())
+		self._order = np.concatenate([self._order, new_rows])
+		self._pending.extend(rows)
+
+		if self._filter:
+			self._mask = np.concatenate([self._mask, self._matches(self._filter[0], self._filter[1], new_rows)])
+			new_rows = new_rows[self._mask[new_rows]]
+		elif self._mask is not None:
+			self._mask = np.concatenate([self._mask, np.zeros(len(new_rows), dtype=bool)])
+			new_rows = new_rows[:0]
+		if self._restriction is not None:
+			# New rows have not been checked against the restriction, so they stay hidden until it is reapplied
+			self._restriction = np.concatenate([self._restriction, np.zeros(len(rows), dtype=bool)])
+			new_rows = new_rows[:0]
+		if len(new_rows):
+			self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(new_rows) - 1)
+			self._rows.extend(new_rows.tolist())
+			self.endInsertRows()
+
+
+class SqliteModel(QAbstractTableModel):
+	"""
+	Read-only table model over a normalized SQLite output, for datasets too large to load.
+	Rows are handed to the view a page at a time through canFetchMore/fetchMore as it scrolls,
+	read on demand and kept in a small LRU cache of pages, so memory does not grow with the file.
+	Sorting and searching run inside SQLite, which writes the matching statement ids in display
+	order to a temporary table; a page is then one lookup on that table's primary key.
+	"""
+	def __init__(self, sqlite_file, page_size=500, max_pages=40, parent=None):
+		super().__init__(parent)
+		self._connection = sqlite3.connect(sqlite_file)
+		self._headers = list(CSV_HEADER)
+		self._page_size = page_size
+		self._max_pages = max_pages
+		self._pages = OrderedDict()  # Page number -> rows, least recently used first
+		self._where = ""  # Search condition and its parameters
+		self._params = ()
+		self._order_by = ""  # ORDER BY expression of the active sort, if any
+		first_id, last_id, count = self._connection.execute(
+			"SELECT MIN(statement_id), MAX(statement_id), COUNT(*) FROM statements").fetchone()
+		# Statement ids are handed out in order when the file is written, so unsorted pages can be read by id
+		self._first_id = first_id or 0
+		self._contiguous = count == 0 or last_id - first_id + 1 == count
+		self._ordered = False  # Whether temp.view_order holds the display order
+		self._total = count  # Rows matching the search
+		self._loaded = 0  # Rows handed to the view so far
+		if not self._contiguous:
+			self._rebuild()  # Statements were deleted after writing, so pages cannot be read by id range
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole:
+			return None
+		if orientation == Qt.Orientation.Horizontal:
+			return self._headers[section] if 0 <= section < len(self._headers) else None
+		return section + 1
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else self._loaded
+
+	def columnCount(self, parent=QModelIndex()):
+		return len(self._headers)
+
+	def canFetchMore(self, parent=QModelIndex()):
+		return not parent.isValid() and self._loaded < self._total
+
+	def fetchMore(self, parent=QModelIndex()):
+		count = min(self._page_size, self._total - self._loaded)
+		if count <= 0:
+			return
+		self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+		self._loaded += count
+		self.endInsertRows()
+
+	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+			return None
+		page, offset = divmod(index.row(), self._page_size)
+		rows = self._page(page)
+		if offset >= len(rows):
+			return None
+		value = rows[offset][index.column()]
+		return "" if value is None else str(value)
+
+	def _page(self, page):
+		rows = self._pages.get(page)
+		if rows is not None:
+			self._pages.move_to_end(page)
+			return rows
+		columns = ", ".join(self._headers)
+		first = page * self._page_size
+		if self._ordered:
+			rows = self._connection.execute(
+				f"SELECT {columns} FROM temp.view_order JOIN statements USING (statement_id) "
+				"JOIN documents USING (document_id) WHERE position BETWEEN ? AND ? ORDER BY position",
+				(first + 1, first + self._page_size)).fetchall()
+		else:
+			first += self._first_id
+			rows = self._connection.execute(
+				f"SELECT {columns} FROM statements JOIN documents USING (document_id) "
+				"WHERE statement_id BETWEEN ? AND ? ORDER BY statement_id",
+				(first, first + self._page_size - 1)).fetchall()
+		self._pages[page] = rows
+		if len(self._pages) > self._max_pages:
+			self._pages.popitem(last=False)
+		return rows
+
+	def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+		"""Sorts in SQLite; day counts sort numerically and dates chronologically, empty fields last."""
+		if not 0 <= column < len(self._headers):
+			return
+		name = self._headers[column]
+		if name in COUNT_COLUMNS:
+			key = f"CAST({name} AS INTEGER)"
+		elif name in DATE_COLUMNS:
+			key = sortable_date(name)
+		else:
+			key = name
+		direction = "ASC" if order == Qt.SortOrder.AscendingOrder else "DESC"
+		self._order_by = f"{name} IS NULL OR {name} = '', {key} {direction}, statement_id"
+		self._rebuild()
+
+	def setFilter(self, column, text):
+		"""Shows only the rows whose column contains text."""
+		if not text or not 0 <= column < len(self._headers):
+			self._where, self._params = "", ()
+		else:
+			self._where, self._params = f"instr({self._headers[column]}, ?) > 0", (text,)
+		self._rebuild()
+
+	def setFilterRecords(self, keys):
+		"""Shows only the rows whose (file_path, position within the file) is in keys."""
+		self._connection.execute("DROP TABLE IF EXISTS temp.search_keys")
+		self._connection.execute("CREATE TEMP TABLE search_keys (file_path TEXT, seq INTEGER, PRIMARY KEY (file_path, seq))")
+		self._connection.executemany("INSERT OR IGNORE INTO temp.search_keys VALUES (?, ?)", keys)
+		self._where = ("EXISTS (SELECT 1 FROM temp.search_keys AS k WHERE k.file_path = documents.file_path "
+					   "AND k.seq = statement_id - (SELECT MIN(s.statement_id) FROM statements AS s "
+					   "WHERE s.document_id = statements.document_id))")
+		self._params = ()
+		self._rebuild()
+
+	def matchCount(self):
+		"""Returns the number of rows matching the search, including those not fetched yet."""
+		return self._total
+
+	def _rebuild(self):
+		"""Recomputes the rows to display for the current search and sort, and drops the cached pages."""
+		self.beginResetModel()
+		self._pages.clear()
+		self._connection.execute("DROP TABLE IF EXISTS temp.view_order")
+		if not self._where and not self._order_by and self._contiguous:
+			self._ordered = False
+			self._total = self._connection.execute("SELECT COUNT(*) FROM statements").fetchone()[0]
+		else:
+			self._connection.execute("CREATE TEMP TABLE view_order (position INTEGER PRIMARY KEY, statement_id INTEGER)")
+			self._connection.execute(
+				"INSERT INTO temp.view_order (statement_id) SELECT statement_id FROM statements "
+				"JOIN documents USING (document_id)" + (f" WHERE {self._where}" if self._where else "")
+				+ f" ORDER BY {self._order_by or 'statement_id'}", self._params)
+			self._ordered = True
+			self._total = self._connection.execute("SELECT COUNT(*) FROM temp.view_order").fetchone()[0]
+		self._loaded = 0
+		self.endResetModel()
+
+	def rowChunks(self, names, size=10000):
+		"""Yields every row matching the search, in display order, as lists of tuples of the named columns."""
+		columns = ", ".join(f"IFNULL({name}, '')" for name in names)
+		if self._ordered:
+			query = (f"SELECT {columns} FROM temp.view_order JOIN statements USING (statement_id) "
+					 "JOIN documents USING (document_id) ORDER BY position")
+		else:
+			query = f"SELECT {columns} FROM statements JOIN documents USING (document_id) ORDER BY statement_id"
+		cursor = self._connection.execute(query)
+		while True:
+			rows = cursor.fetchmany(size)
+			if not rows:
+				return
+			yield rows
+
+	def close(self):
+		self._connection.close()
+
+
+class ExportDialog(QDialog):
+    """Asks which columns to export next to the statements, which are always included."""
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Export Statements')
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel('Columns to export:'))
+        self.columnList = QListWidget()
+        for header in headers:
+            item = QListWidgetItem(header)
+            if header == 'Statement':
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsUserCheckable & ~Qt.ItemFlag.ItemIsEnabled)
+            checked = header in ('Category', 'Statement')
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            self.columnList.addItem(item)
+        layout.addWidget(self.columnList)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def selectedColumns(self):
+        items = (self.columnList.item(row) for row in range(self.columnList.count()))
+        return [item.text() for item in items if item.checkState() == Qt.CheckState.Checked]
+
+
+EXPORT_FILTERS = {'CSV (*.csv)': '.csv', 'JSON Lines (*.jsonl)': '.jsonl', 'Text (*.txt)': '.txt'}
+
+class ParseWorker(QThread):
+    """
+    Parses PDFs off the UI thread, writes them to the output file and hands the records
+    to the window in batches while the batch is still running.
+    Given watch_directories, it then keeps watching them and reports every update with filesUpdated.
+    """
+    recordsReady = pyqtSignal(list)
+    progress = pyqtSignal(int, int)
+    parsingDone = pyqtSignal(int)
+    filesUpdated = pyqtSignal(list, list, int)
+
+    def __init__(self, pdf_files, output_file, workers=None, cache_file=None, index_file=None, extraction="text",
+                 batch_size=2000, batch_interval=0.25, watch_directories=None, recursive=False, interval=2.0,
+                 settle=2.0, report_file=None, budget=None, parent=None):
+        super().__init__(parent)
+        self.pdf_files = pdf_files
+        self.output_file = output_file
+        self.workers = workers
+        self.cache_file = cache_file
+        self.index_file = index_file
+        self.extraction = extraction
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.watch_directories = watch_directories
+        self.recursive = recursive
+        self.interval = interval
+        self.settle = settle
+        self.report_file = report_file
+        self.budget = budget
+
+    def run(self):
+        # The cache and index are opened inside run_batch, on this thread, since sqlite connections are bound to one thread
+        try:
+            if self.watch_directories:
+                watch(self.watch_directories, self.output_file, self.recursive, self.workers, self.cache_file,
+                      self.index_file, self.extraction, self.interval, self.settle, self.progress.emit, self._batched,
+                      self.parsingDone.emit, self._updated, self.isInterruptionRequested, self.report_file,
+                      self.budget)
+                return
+            count = run_batch(self.pdf_files, self.output_file, self.workers, self.cache_file, self.index_file,
+                              self.extraction, self.progress.emit, self._batched, self.report_file, self.budget)
+        except Interrupted:
+            return  # The window is closing; the previous output is kept rather than replaced by a partial one
+        self.parsingDone.emit(count)
+
+    def _batched(self, records):
+        """
+        Passes records through to the CSV writer and emits them in batches on the way. Raises
+        Interrupted when the window asks the thread to stop, so the output is not saved.
+        """
+        batch = []
+        last_emit = time.monotonic()
+        for record in records:
+            if self.isInterruptionRequested():
+                raise Interrupted
+            batch.append(record)
+            yield record
+            if len(batch) >= self.batch_size or time.monotonic() - last_emit >= self.batch_interval:
+                self.recordsReady.emit(batch)
+                batch = []
+                last_emit = time.monotonic()
+        if batch:
+            self.recordsReady.emit(batch)
+
+    def _updated(self, file_paths, records, count):
+        self.filesUpdated.emit(sorted(file_paths), records, count)
+
+
+FULL_TEXT_SEARCH = 'All columns (full-text)'
+PAGED_ROWS = 200000  # SQLite outputs with more statements than this are paged from disk instead of loaded
+QUERY = 'Query (e.g. days_supervised > 300 AND period_end in FY25)'
+
+class MyApp(QWidget):
+
+    def __init__(self, defaultSource=None, autoRetrieve=True):
+        super().__init__()
+        self.window_width, self.window_height = 1100, 500
+        self.resize(self.window_width, self.window_height)
+        self.setWindowTitle('CSV Data Viewer')
+        self.setWindowIcon(QIcon('./icon/browser.png'))
+        self.df = None
+        self.setStyleSheet("""
+            QWidget {
+                font-size: 15px;
+            }
+            QComboBox {
+                width: 160px;
+            }
+            QPushButton {
+                width: 100px;
+            }
+        """)
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+        self.model = None
+        self.worker = None
+        self.recordCount = 0
+
+        self.initUI(defaultSource, autoRetrieve)
+
+    def retrieveDataset(self):
+        try:
+            source = self.dataSourceField.text()
+            model = None
+            if source.lower().endswith(SQLITE_EXTENSIONS):
+                model = SqliteModel(source)
+                if model.matchCount() <= PAGED_ROWS:
+                    model.close()
+                    model = None
+            if model is None:
+                self.df = load_dataset(source)
+                model = PandasModel(self.df)
+            else:
+                self.df = None  # Too large to load, the model pages it from disk
+            self.setModel(model)
+
+            self.comboColumns.clear()
+            self.comboColumns.addItems(CSV_HEADER)
+            self.comboColumns.addItem(FULL_TEXT_SEARCH)
+            if self.df is not None:
+                self.comboColumns.addItem(QUERY)
+            else:
+                self.statusLabel.setText(f'{model.matchCount()} statements, loaded page by page as you scroll')
+            if self.duplicatesOnly.isChecked():
+                self.showDuplicates(True)
+        except Exception as e:
+            self.statusLabel.setText(str(e))
+            return
+
+    def setModel(self, model):
+        """Shows model in the table, closing the SQLite file of a paged model it replaces."""
+        if isinstance(self.model, SqliteModel):
+            self.model.close()
+        self.model = model
+        self.table.setModel(model)
+
+    def startParsing(self, pdf_files, workers=None, cache_file=None, index_file=None, extraction="text",
+                     watch_directories=None, recursive=False, interval=2.0, settle=2.0, report_file=None,
+                     budget=None):
+        """
+        Shows an empty table and fills it from a background ParseWorker as the PDFs are parsed.
+        With watch_directories, the table then follows the PDFs added, modified or removed there.
+        """
+        self.df = typed_frame(pd.DataFrame(columns=CSV_HEADER))
+        self.setModel(PandasModel(self.df))
+        self.comboColumns.clear()
+        self.comboColumns.addItems(self.df.columns)
+        self.comboColumns.addItem(FULL_TEXT_SEARCH)
+        self.comboColumns.addItem(QUERY)
+        self.recordCount = 0
+        self.statusLabel.setText(f'Parsing {len(pdf_files)} PDFs...')
+
+        self.worker = ParseWorker(pdf_files, self.dataSourceField.text(), workers, cache_file, index_file, extraction,
+                                  watch_directories=watch_directories, recursive=recursive, interval=interval,
+                                  settle=settle, report_file=report_file, budget=budget, parent=self)
+        self.worker.recordsReady.connect(self.appendRecords)
+        self.worker.progress.connect(self.showProgress)
+        self.worker.parsingDone.connect(self.parsingDone)
+        self.worker.filesUpdated.connect(self.updateFiles)
+        self.worker.start()
+
+    def appendRecords(self, records):
+        self.model.appendRows(records)
+        self.recordCount += len(records)
+
+    def showProgress(self, done, total):
+        self.statusLabel.setText(f'Parsed {done} of {total} PDFs ({self.recordCount} statements loaded)')
+
+    def parsingDone(self, count):
+        self.statusLabel.setText(f'Parsing complete. {count} statements saved to {self.dataSourceField.text()}')
+        if self.duplicatesOnly.isChecked():
+            self.showDuplicates(True)
+
+    def updateFiles(self, file_paths, records, count):
+        """Replaces the rows of the PDFs that changed on disk, leaving the rest of the table alone."""
+        self.model.removeFiles(file_paths)
+        self.model.appendRows(records)
+        self.recordCount = count
+        self.statusLabel.setText(f'{len(file_paths)} PDFs updated at {time.strftime("%H:%M:%S")}. '
+                                 f'{count} statements saved to {self.dataSourceField.text()}')
+        if self.duplicatesOnly.isChecked():
+            self.showDuplicates(True)
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().closeEvent(event)
+
+    def searchItem(self, v):
+        # Wait until typing pauses before filtering
+        self.searchTimer.start()
+
+    def applySearch(self):
+        if self.model is None:
+            return
+        if self.comboColumns.currentText() == FULL_TEXT_SEARCH and self.searchField.text():
+            self.fullTextSearch(self.searchField.text())
+        elif self.comboColumns.currentText() == QUERY and self.searchField.text():
+            self.runQuery(self.searchField.text())
+        else:
+            self.model.setFilter(self.comboColumns.currentIndex(), self.searchField.text())
+
+    def fullTextSearch(self, text):
+        """Answers the query from the full-text index kept next to the data source."""
+        index_file = index_path_for(self.dataSourceField.text())
+        if not os.path.exists(index_file):
+            self.statusLabel.setText(f'No full-text index found at {index_file}')
+            return
+        try:
+            start = time.perf_counter()
+            index = SearchIndex(index_file)
+            try:
+                keys = index.search(text)
+            finally:
+                index.close()
+            self.model.setFilterRecords(keys)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.statusLabel.setText(f'{self.model.matchCount()} matching statements ({elapsed:.0f} ms)')
+        except sqlite3.Error as e:
+            self.statusLabel.setText(f'Invalid search: {e}')
+
+    def runQuery(self, text):
+        """Filters on a query over the typed columns, leaving the table as it was if the query is incomplete."""
+        start = time.perf_counter()
+        try:
+            mask = query_mask(self.model.dataFrame(), text)
+        except ValueError as e:
+            self.statusLabel.setText(str(e))
+            return
+        self.model.setFilterMask(mask)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.statusLabel.setText(f'{mask.sum()} matching statements ({elapsed:.0f} ms)')
+
+    def showDuplicates(self, checked):
+        """Limits the table to statements with a near duplicate anywhere in the data, or shows them all again."""
+        if self.model is None:
+            return
+        if not isinstance(self.model, PandasModel):
+            if checked:
+                self.statusLabel.setText('Duplicates can only be found in datasets that fit in memory')
+            return
+        if not checked:
+            self.model.setRestriction(None)
+            return
+        start = time.perf_counter()
+        statements = self.model.columnValues('Statement')
+        groups = find_duplicates(statements)
+        mask = np.zeros(len(statements), dtype=bool)
+        if groups:
+            mask[np.concatenate(groups)] = True
+        self.model.setRestriction(mask)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.statusLabel.setText(f'{mask.sum()} statements in {len(groups)} groups of near duplicates ({elapsed:.0f} ms)')
+
+    def copy_to_clipboard(self):
+        """Copies the statements of the rows shown, one per line."""
+        if self.model is None:
+            return
+        statements = [row[0] for rows in self.model.rowChunks(['Statement']) for row in rows]
+        if not statements:
+            self.statusLabel.setText('No statements to copy')
+            return
+        QApplication.clipboard().setText("\n".join(statements))
+        self.statusLabel.setText(f'Copied {len(statements)} statements to the clipboard')
+
+    def exportStatements(self):
+        """Asks for columns and a file, then streams the rows shown to it as CSV, JSON Lines or text."""
+        if self.model is None:
+            return
+        dialog = ExportDialog(CSV_HEADER, self)
+        if not dialog.exec():
+            return
+        output_file, selected_filter = QFileDialog.getSaveFileName(
+            self, 'Export Statements', 'statements.csv', ';;'.join(EXPORT_FILTERS))
+        if not output_file:
+            return
+        if os.path.splitext(output_file)[1].lower() not in EXPORT_FORMATS:
+            output_file += EXPORT_FILTERS.get(selected_filter, '.csv')
+        self.exportTo(output_file, dialog.selectedColumns())
+
+    def exportTo(self, output_file, columns):
+        start = time.perf_counter()
+        try:
+            count = write_rows(self.model.rowChunks(columns), columns, output_file)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.statusLabel.setText(f'Export failed: {e}')
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.statusLabel.setText(f'Exported {count} statements to {output_file} ({elapsed:.0f} ms)')
+
+    def initUI(self, defaultSource, autoRetrieve=True):
+        sourceLayout = QHBoxLayout()
+        self.layout.addLayout(sourceLayout)
+
+        label = QLabel('&Data Source: ')
+        self.dataSourceField = QLineEdit(defaultSource)  # Default value set here
+        label.setBuddy(self.dataSourceField)
+
+        buttonRetrieve = QPushButton('&Retrieve', clicked=self.retrieveDataset)
+        buttonCopy = QPushButton('&Copy Statements', clicked=self.copy_to_clipboard)
+        buttonExport = QPushButton('&Export...', clicked=self.exportStatements)
+
+        sourceLayout.addWidget(label)
+        sourceLayout.addWidget(self.dataSourceField)
+        sourceLayout.addWidget(buttonRetrieve)
+
+        # search field
+        
+        searchLayout = QHBoxLayout()
+        self.layout.addLayout(searchLayout)
+
+        label = QLabel('&Search: ')
+        self.searchField = QLineEdit()
+        self.searchField.textChanged.connect(self.searchItem)
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(200)
+        self.searchTimer.timeout.connect(self.applySearch)
+        label.setBuddy(self.searchField)
+        searchLayout.addWidget(label)
+        searchLayout.addWidget(self.searchField)
+        searchLayout.addWidget(buttonCopy)
+        searchLayout.addWidget(buttonExport)
+
+        self.comboColumns = QComboBox()
+        self.comboColumns.currentIndexChanged.connect(self.searchItem)
+        
+        searchLayout.addWidget(self.comboColumns)
+
+        self.duplicatesOnly = QCheckBox('&Duplicates only')
+        self.duplicatesOnly.toggled.connect(self.showDuplicates)
+        searchLayout.addWidget(self.duplicatesOnly)
+
+        self.table = QTableView()
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSectionsMovable(True)
+        self.layout.addWidget(self.table)
+
+        self.statusLabel = QLabel()
+        self.statusLabel.setText('')
+        self.layout.addWidget(self.statusLabel)
+
+        # Automatically call the retrieveDataset function after UI is initialized
+        if autoRetrieve:
+            self.retrieveDataset()
+
+
+def run_viewer(pdf_files, output_file, workers=None, cache_file=None, index_file=None, extraction="text",
+               watch_directories=None, recursive=False, interval=2.0, settle=2.0, report_file=None, budget=None):
+    """
+    Opens the viewer and parses pdf_files into output_file in the background, then keeps following
+    watch_directories if given. Returns the exit code.
+    """
+    app = QApplication(sys.argv)
+    app.setStyleSheet('''
+		QWidget {
+			font-size: 17px;
+		}
+	''')
+	
+    myApp = MyApp(output_file, autoRetrieve=False)
+    myApp.show()
+    myApp.startParsing(pdf_files, workers, cache_file, index_file, extraction, watch_directories, recursive,
+                       interval, settle, report_file, budget)
+
+    try:
+        return app.exec()
+    finally:
+        print('Closing Window...')
@@ -0,0 +1,179 @@
+"""
+Checks that categorize_lines, which finds labels with one trie regex, captures the same
+statements and fields as the label-by-label loop it replaced, on random sequences of label,
+value and statement lines, and times both versions.
+
+    python benchmarks/bench_labels.py [cases]
+
+One difference is intended: an unsigned ratee or HLR signature block used to take its date from
+the 'parts' list left over from an earlier signature line (or fail if there was none). The legacy
+version below marks that spot and starts from an empty list instead, as the new code does.
+"""
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBScraper import (CATEGORIES, FIELD_LABELS, IGNORE_TEXT, METADATA_FIELDS, categorize_lines,
+                        extract_number_from_text, is_valid_date, remove_unwanted_text, split_sentences)
+from generate_corpus import random_statement
+
+
+def legacy_categorize_lines(lines, file_path, file_name):
+    categorized_statements = []
+    current_category = None
+    statement = []
+    recent_lines = []
+    fields = dict.fromkeys(METADATA_FIELDS)
+    found = set()
+    parts = []
+
+    def first(label, i):
+        # The old '*_found' flags: only the first occurrence of a label that has a following line counts
+        if label in line and label not in found and i + 1 < len(lines):
+            found.add(label)
+            return True
+        return False
+
+    def signed(next_line):
+        return next_line.strip().split(',')
+
+    def signature_date(parts):
+        if len(parts) > 3:
+            value = parts[3].strip().strip('\\')
+            return value if is_valid_date(value) else None
+        return None
+
+    for i, line in enumerate(lines):
+        for category in CATEGORIES:
+            if line.startswith(category):
+                if current_category and statement:
+                    filtered_statement = remove_unwanted_text(current_category, ' '.join(statement))
+                    categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
+                current_category = category
+                statement = [line[len(category):].strip()]
+                recent_lines = []
+                break
+        else:
+            if any(ignored_text in line for ignored_text in IGNORE_TEXT.get(current_category, [])):
+                continue
+
+            if current_category == "HIGHER LEVEL REVIEWER ASSESSMENT":
+                if "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE" in line:
+                    filtered_statement = remove_unwanted_text(current_category, ' '.join(recent_lines[-3:]))
+                    categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
+                    current_category = None
+                elif "FUTURE ROLES" in line:
+                    fields["future_role_1"] = lines[i + 1].strip().split("1.", 1)[1].strip()
+                    fields["future_role_2"] = lines[i + 2].strip().split("2.", 1)[1].strip()
+                    fields["future_role_3"] = lines[i + 3].strip().split("3.", 1)[1].strip()
+                else:
+                    recent_lines.append(line.strip())
+                    recent_lines = recent_lines[-5:]
+            elif current_category:
+                statement.append(line.strip())
+
+            following = lines[i + 1] if i + 1 < len(lines) else ""
+            if first("HIGHER LEVEL REVIEWER DUTY TITLE", i):
+                fields["hlr_duty_title"] = following.strip()
+            if first("HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE", i):
+                fields["hlr_name"] = following.strip()
+            if first("RATER NAME, GRADE, AND BRANCH OF SERVICE", i):
+                fields["rater_name"] = following.strip()
+            if first("HIGHER LEVEL REVIEWER SIGNATURE", i):
+                # Was: the unsigned branch kept the previous signature's 'parts'
+                parts = [] if "HIGHER LEVEL REVIEWER DUTY TITLE" in following else signed(following)
+                if len(parts) > 3:
+                    fields["hlr_signed"] = signature_date(parts)
+            if first("RATER SIGNATURE", i):
+                parts = signed(following)
+                if len(parts) > 3:
+                    fields["rater_signed"] = signature_date(parts)
+            if first("RATER DUTY TITLE", i):
+                fields["rater_duty_title"] = following.strip()
+            if first("RATEE ACKNOWLEDGEMENT", i):
+                # Was: the unsigned branch kept the previous signature's 'parts'
+                parts = [] if "ORGANIZATION AND COMMAND" in following else signed(following)
+                if len(parts) > 3:
+                    fields["ratee_signed"] = signature_date(parts)
+            if first("STRATIFICATION", i):
+                fields["strat"] = "" if "FORCED ENDORSEMENT" in following else following.strip()
+            if first("PROMOTION RECOMMENDATION", i):
+                fields["promotion_recommendation"] = "" if "RATER ASSESSMENT" in following else following.strip()
+            if "DAYS SUPERVISED" in line and i + 1 < len(lines):
+                fields["days_supervised"] = extract_number_from_text(following)
+            if "DAYS NON-RATED" in line and i + 1 < len(lines):
+                fields["days_non_rated"] = extract_number_from_text(following)
+            if first("DUTY TITLE", i):
+                fields["duty_title"] = "" if "DAFSC" in following else following.strip()
+            if first("DAFSC", i):
+                fields["dafsc"] = following.strip()
+            if first("REASON", i):
+                fields["reason"] = following.strip()
+            if first("ORGANIZATION AND COMMAND", i):
+                fields["org"] = following.strip()
+            if first("LOCATION", i):
+                fields["location"] = following.strip()
+            if first("PERIOD", i):
+                period_text = following.strip()
+                if "THRU" in period_text:
+                    start, end = (part.strip() for part in period_text.split("THRU", 1))
+                    fields["period_start"] = start if is_valid_date(start) else None
+                    fields["period_end"] = end if is_valid_date(end) else None
+
+    if current_category and statement:
+        filtered_statement = remove_unwanted_text(current_category, ' '.join(statement))
+        categorized_statements.extend(split_sentences(current_category, filtered_statement, file_path, file_name))
+    return [record + [fields[field] for field in METADATA_FIELDS] for record in categorized_statements]
+
+
+def new_categorize_lines(lines, file_path, file_name):
+    statements, metadata = categorize_lines(lines, file_path, file_name)
+    return [record + [metadata[field] for field in METADATA_FIELDS] for record in statements]
+
+
+def random_lines(rng, pool):
+    lines = []
+    for _ in range(rng.randint(1, 40)):
+        if rng.random() < 0.2:
+            lines.append(random_statement(rng, rng.randint(1, 3)))
+        else:
+            lines.append(rng.choice(pool))
+    return lines
+
+
+def main(cases=20_000):
+    rng = random.Random(1)
+    labels = list(FIELD_LABELS) + ["FUTURE ROLES"] + [text for texts in IGNORE_TEXT.values() for text in texts]
+    pool = labels + CATEGORIES + [category + " Led the team." for category in CATEGORIES] + [
+        "1 Jan 24 THRU 2 Feb 25", "31 Feb 24 THRU 1 Jan 25", "PERIOD THRU", "A, B, C, 5 Jan 25", "A, B, C, 5 Jan 25\\",
+        "A, B, C, 5 January 25", "A, B", "365 days", "0", "FORCED ENDORSEMENT", "x DUTY TITLE y", "RATER SIGNATURE extra",
+        "RATER DUTY TITLE and DAFSC", "1. Flight Chief", "2. Superintendent", "3. Instructor", "Some text", "",
+    ]
+
+    compared = skipped = 0
+    samples = []
+    for _ in range(cases):
+        lines = random_lines(rng, pool)
+        try:
+            old = legacy_categorize_lines(lines, "X-EPB.pdf", "X")
+        except IndexError:
+            skipped += 1  # The old FUTURE ROLES code read past the end or past a missing "1." marker
+            continue
+        new = new_categorize_lines(lines, "X-EPB.pdf", "X")
+        assert new == old, f"categorize_lines differs from the old parser on {lines!r}:\n{new}\n{old}"
+        compared += 1
+        samples.append(lines)
+    print(f"{compared} line sequences: new output matches the old output ({skipped} that crashed the old parser skipped)")
+
+    before = min(timeit.repeat(lambda: [legacy_categorize_lines(lines, "X-EPB.pdf", "X") for lines in samples],
+                               number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [new_categorize_lines(lines, "X-EPB.pdf", "X") for lines in samples],
+                              number=1, repeat=3))
+    print(f"{'categorize_lines':22} old {before:7.3f} s   new {after:7.3f} s   {before / after:5.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,82 @@
+"""
+Runs the scraper over a folder once as a single headless run and once as N --shard processes
+side by side followed by --merge, then checks that the merged output, sources and quarantine
+files match the single run byte for byte and prints both timings.
+
+    python benchmarks/bench_shards.py [DIRECTORY] [--shards N] [--count COUNT]
+
+Without DIRECTORY, COUNT synthetic EPBs are generated into a temporary folder.
+"""
+import os
+import sys
+import glob
+import time
+import filecmp
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "EPBScraper.py")
+sys.path.insert(0, REPO_DIR)
+
+from generate_corpus import generate_corpus
+
+
+def run(command):
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run_single(directory, output_file, workers):
+    start = time.perf_counter()
+    run([sys.executable, SCRIPT, directory, "--recursive", "--headless", "--no-cache", "--workers", str(workers),
+         "--output", output_file])
+    return time.perf_counter() - start
+
+
+def run_sharded(directory, output_file, shards, workers):
+    """Starts every shard as its own process, waits for all of them, then merges. Returns the wall time."""
+    start = time.perf_counter()
+    processes = [
+        subprocess.Popen([sys.executable, SCRIPT, directory, "--recursive", "--shard", f"{shard}/{shards}",
+                          "--no-cache", "--workers", str(workers), "--output", output_file],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for shard in range(1, shards + 1)
+    ]
+    for process in processes:
+        if process.wait() != 0:
+            raise RuntimeError(f"shard exited with status {process.returncode}: {' '.join(process.args)}")
+    shard_files = sorted(glob.glob(os.path.splitext(output_file)[0] + f"_shard*of{shards}.jsonl"))
+    run([sys.executable, SCRIPT, "--merge", *shard_files, "--output", output_file])
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks that sharded runs merge into the output of a single run.")
+    parser.add_argument("directory", nargs="?", help="folder of EPB PDFs (default: a generated corpus)")
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--count", type=int, default=300, help="synthetic EPBs to generate (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes per run (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work:
+        directory = args.directory
+        if directory is None:
+            directory = os.path.join(work, "corpus")
+            generate_corpus(directory, args.count)
+        single = run_single(directory, os.path.join(work, "single.csv"), args.workers * args.shards)
+        sharded = run_sharded(directory, os.path.join(work, "sharded.csv"), args.shards, args.workers)
+        print(f"single run: {single:.2f} s, {args.shards} shards + merge: {sharded:.2f} s")
+
+        different = [suffix for suffix in (".csv", "_sources.csv", "_quarantine.csv")
+                     if not filecmp.cmp(os.path.join(work, "single" + suffix), os.path.join(work, "sharded" + suffix),
+                                        shallow=False)]
+    if different:
+        print("merged output differs from the single run: " + ", ".join(different))
+        return 1
+    print("merged output matches the single run")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
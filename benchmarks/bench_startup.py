@@ -0,0 +1,58 @@
+"""
+Measures how long the headless command line takes to start and finish on an empty folder, and
+fails when it is over budget or when it loads the GUI stack (PyQt6, pandas).
+
+    python benchmarks/bench_startup.py [--budget SECONDS] [--runs N]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "EPBScraper.py")
+GUI_MODULES = ("PyQt6", "pandas", "numpy")
+DEFAULT_BUDGET = 1.0
+
+
+def measure_startup(runs=5):
+    """Returns the best wall time of running the headless scraper on an empty folder."""
+    best = None
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, SCRIPT, directory, "--headless", "--no-cache", "--no-index", "--workers", "1",
+                   "--output", os.path.join(directory, "output.csv")]
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def gui_modules_loaded():
+    """Returns the GUI modules that importing EPBScraper pulls in; there should be none."""
+    code = f"import sys, EPBScraper; print('loaded:', *(m for m in {GUI_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, check=True, capture_output=True, text=True)
+    # PyMuPDF may print its own notices on import, so only read the line this code printed
+    line = [line for line in result.stdout.splitlines() if line.startswith("loaded:")][-1]
+    return line.split()[1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks the headless startup time of EPBScraper.py.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    loaded = gui_modules_loaded()
+    seconds = measure_startup(args.runs)
+    print(f"headless startup: {seconds:.3f} s (budget {args.budget:.3f} s)")
+    if loaded:
+        print("GUI modules imported by the headless path: " + ", ".join(loaded))
+    return 1 if loaded or seconds > args.budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
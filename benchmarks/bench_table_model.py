@@ -0,0 +1,82 @@
+"""
+Measures the cost of one PandasModel.data() call, the call Qt makes for every painted cell,
+against the original per-cell iloc implementation.
+
+    python benchmarks/bench_table_model.py [rows]
+"""
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from PyQt6.QtCore import Qt, QAbstractTableModel, QVariant, QModelIndex
+
+from EPBScraper import CSV_HEADER
+from EPBViewer import PandasModel
+
+
+class IlocPandasModel(QAbstractTableModel):
+	"""The model as it was before the column string cache, kept as the baseline."""
+	def __init__(self, df, parent=None):
+		super().__init__(parent)
+		self._df = df
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole:
+			return QVariant()
+		if orientation == Qt.Orientation.Horizontal:
+			return self._df.columns.tolist()[section]
+		return self._df.index.tolist()[section]
+
+	def rowCount(self, parent=QModelIndex()):
+		return self._df.shape[0]
+
+	def columnCount(self, parent=QModelIndex()):
+		return self._df.shape[1]
+
+	def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+		if role != Qt.ItemDataRole.DisplayRole:
+			return QVariant()
+		if not index.isValid():
+			return QVariant()
+		return QVariant(str(self._df.iloc[index.row(), index.column()]))
+
+
+def make_frame(rows):
+    rng = random.Random(0)
+    data = {column: [f"{column} {rng.randint(0, 999)}" for _ in range(rows)] for column in CSV_HEADER}
+    data["days_supervised"] = [rng.randint(0, 365) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+
+def time_model(model, cells, repeat=3):
+    indexes = [model.index(row, column) for row, column in cells]
+    data = model.data
+    best = min(timeit.repeat(lambda: [data(index) for index in indexes], number=1, repeat=repeat))
+    return best / len(indexes)
+
+
+def time_headers(model, sections, repeat=3):
+    header = model.headerData
+    best = min(timeit.repeat(lambda: [header(section, Qt.Orientation.Vertical) for section in sections], number=1, repeat=repeat))
+    return best / len(sections)
+
+
+def main(rows=200_000, samples=20_000):
+    df = make_frame(rows)
+    rng = random.Random(1)
+    cells = [(rng.randrange(rows), rng.randrange(len(CSV_HEADER))) for _ in range(samples)]
+    sections = [rng.randrange(rows) for _ in range(200)]
+
+    print(f"{rows} rows, {samples} random cells")
+    before, after = time_model(IlocPandasModel(df), cells), time_model(PandasModel(df), cells)
+    print(f"data():       iloc {before * 1e6:8.2f} us/cell   cached {after * 1e6:8.2f} us/cell   {before / after:6.1f}x")
+    before, after = time_headers(IlocPandasModel(df), sections), time_headers(PandasModel(df), sections)
+    print(f"headerData(): iloc {before * 1e6:8.2f} us/call   cached {after * 1e6:8.2f} us/call   {before / after:6.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,100 @@
+"""
+Compares split_sentences, remove_unwanted_text and is_valid_date with the implementations they
+replaced, and checks that both produce the same output on a large synthetic statement set.
+
+    python benchmarks/bench_text.py [statements]
+"""
+import os
+import re
+import sys
+import random
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBScraper import IGNORE_TEXT, is_valid_date, parse_date, remove_unwanted_text, split_sentences
+from generate_corpus import MONTHS, random_statement
+
+
+def legacy_split_sentences(category, statement, file_path, file_name):
+    if category == "HIGHER LEVEL REVIEWER ASSESSMENT":
+        return [[category, statement, file_path, file_name]]
+    statement = re.sub(r'\b(?:Dr|Mr|Ms|U\.S\.)\b', lambda match: match.group(0).replace('.', '__DOT__'), statement)
+    statement = re.sub(r'(\d)(?=\.\d)', r'\1__DOT__', statement)
+    sentences = re.split(r'(?<=[.!?])\s+', statement)
+    sentences = [s.replace('__DOT__', '.') for s in sentences]
+    processed_statements = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if sentence and not sentence.endswith(('.', '!', '?')):
+            sentence += '.'
+        processed_statements.append([category, sentence, file_path, file_name])
+    return processed_statements
+
+
+def legacy_remove_unwanted_text(category, statement):
+    for text in IGNORE_TEXT.get(category, []):
+        statement = statement.replace(text, "")
+    if category == "IMPROVING THE UNIT":
+        truncation_point = "RATER NAME, GRADE, AND BRANCH OF SERVICE"
+        if truncation_point in statement:
+            statement = statement.split(truncation_point)[0]
+    return re.sub(r'\s+', ' ', statement).strip()
+
+
+def legacy_is_valid_date(date_str):
+    if not re.match(r"^\d{1,2} [A-Za-z]{3} \d{2}$", date_str):
+        return False
+    try:
+        datetime.strptime(date_str, "%d %b %y")
+        return True
+    except ValueError:
+        return False
+
+
+def undouble_numeric_periods(text):
+    # The old placeholder round-trip turned "1.4" into "1..4"; the new segmenter keeps the number intact
+    return re.sub(r'(\d)\.\.(?=\d)', r'\1.', text)
+
+
+def best(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(count=200_000):
+    rng = random.Random(0)
+    categories = ["DUTY DESCRIPTION", "EXECUTING THE MISSION", "LEADING PEOPLE", "MANAGING RESOURCES", "IMPROVING THE UNIT"]
+    raw = []
+    for _ in range(count):
+        category = rng.choice(categories)
+        extras = [" Dr. Smith's U.S. team hit 99.9% uptime!", " Saved $1.2M ", "\n  ", " wow"]
+        text = random_statement(rng, rng.randint(1, 4)) + rng.choice(extras)
+        raw.append((category, (IGNORE_TEXT.get(category, [""])[0] + "\n " + text) if rng.random() < 0.3 else text))
+    dates = [f"{rng.randint(0, 35)} {rng.choice(MONTHS + ['Foo', 'sep'])} {rng.randint(0, 99):02d}" for _ in range(count)]
+    dates += ["", "1 January 24", "29 Feb 23", "29 Feb 24"]
+
+    filtered = [(category, remove_unwanted_text(category, text)) for category, text in raw]
+    assert filtered == [(category, legacy_remove_unwanted_text(category, text)) for category, text in raw]
+    new = [split_sentences(category, text, "x.pdf", "x") for category, text in filtered]
+    old = [legacy_split_sentences(category, text, "x.pdf", "x") for category, text in filtered]
+    assert [[record[1] for record in records] for records in new] == \
+        [[undouble_numeric_periods(record[1]) for record in records] for records in old]
+    assert [is_valid_date(value) for value in dates] == [legacy_is_valid_date(value) for value in dates]
+    print(f"{count} statements and {len(dates)} dates: new output matches the old output")
+
+    rows = [
+        ("remove_unwanted_text", lambda: [legacy_remove_unwanted_text(c, t) for c, t in raw],
+                                 lambda: [remove_unwanted_text(c, t) for c, t in raw]),
+        ("split_sentences", lambda: [legacy_split_sentences(c, t, "x.pdf", "x") for c, t in filtered],
+                            lambda: [split_sentences(c, t, "x.pdf", "x") for c, t in filtered]),
+        ("is_valid_date", lambda: [legacy_is_valid_date(value) for value in dates],
+                          lambda: (parse_date.cache_clear(), [is_valid_date(value) for value in dates])),
+    ]
+    for name, old_function, new_function in rows:
+        before, after = best(old_function), best(new_function)
+        print(f"{name:22} old {before:7.3f} s   new {after:7.3f} s   {before / after:5.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
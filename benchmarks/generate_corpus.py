@@ -0,0 +1,139 @@
+"""
+Writes synthetic EPB PDFs for benchmarking, so no real EPBs have to be shared.
+
+Every document uses the EPB layout parse_pdf expects: the header blocks (DUTY TITLE, DAFSC,
+REASON, PERIOD ... THRU ..., ORGANIZATION AND COMMAND, LOCATION, DAYS SUPERVISED, DAYS NON-RATED),
+the five rater categories with their static descriptions, the rater and ratee signature lines,
+and the HIGHER LEVEL REVIEWER ASSESSMENT with STRATIFICATION, PROMOTION RECOMMENDATION,
+FUTURE ROLES and the HLR signature block.
+
+    python benchmarks/generate_corpus.py DIRECTORY COUNT [--statements N] [--seed N]
+"""
+import os
+import sys
+import random
+import argparse
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from EPBScraper import IGNORE_TEXT
+
+LAST_NAMES = ["SMITH", "JOHNSON", "GARCIA", "NGUYEN", "PATEL", "KIM", "BROWN", "DAVIS", "LOPEZ", "WILSON"]
+FIRST_NAMES = ["ALEX", "JORDAN", "TAYLOR", "MORGAN", "CASEY", "RILEY", "JAMIE", "AVERY", "DREW", "QUINN"]
+GRADES = ["SrA", "SSgt", "TSgt", "MSgt", "SMSgt"]
+DUTY_TITLES = ["Cyber Systems Operator", "Client Systems Technician", "Section Chief", "Flight Chief", "Superintendent"]
+ORGS = ["1st Communications Squadron, ACC", "52nd Operations Support Squadron, USAFE", "18th Wing, PACAF"]
+LOCATIONS = ["Langley AFB, VA", "Spangdahlem AB, GE", "Kadena AB, JA"]
+ROLES = ["Flight Chief", "Superintendent", "First Sergeant", "Instructor", "Section Chief", "Career Advisor"]
+VERBS = ["Led", "Managed", "Directed", "Executed", "Spearheaded", "Orchestrated", "Mentored", "Automated", "Secured"]
+OBJECTS = ["network upgrade", "deployment", "inspection prep", "training program", "budget review", "cyber exercise"]
+RESULTS = ["saved {n} hrs", "cut costs by ${n}K", "boosted readiness {n}%", "trained {n} Amn", "closed {n} tickets"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+LINES_PER_PAGE = 70
+WRAP_WIDTH = 110
+
+
+def random_date(rng, year):
+    return f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {year:02d}"
+
+
+def random_name(rng):
+    return f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}"
+
+
+def random_statement(rng, sentences):
+    parts = []
+    for _ in range(sentences):
+        result = rng.choice(RESULTS).format(n=rng.randint(2, 500))
+        parts.append(f"{rng.choice(VERBS)} {rng.randint(2, 90)}-mbr {rng.choice(OBJECTS)} worth ${rng.randint(1, 9)}.{rng.randint(1, 9)}M; {result}.")
+    return " ".join(parts)
+
+
+def epb_lines(rng, statements_per_category):
+    """Returns the text lines of one synthetic EPB."""
+    year = rng.randint(20, 25)
+    rater, hlr = random_name(rng), random_name(rng)
+    lines = [
+        "ENLISTED PERFORMANCE BRIEF",
+        "DUTY TITLE", rng.choice(DUTY_TITLES),
+        "DAFSC", f"1D7{rng.randint(1, 9)}1",
+        "REASON", "Annual",
+        "PERIOD", f"{random_date(rng, year - 1)} THRU {random_date(rng, year)}",
+        "ORGANIZATION AND COMMAND", rng.choice(ORGS),
+        "LOCATION", rng.choice(LOCATIONS),
+        "DAYS SUPERVISED", str(rng.randint(120, 365)),
+        "DAYS NON-RATED", str(rng.randint(0, 30)),
+        "DUTY DESCRIPTION " + random_statement(rng, 1),
+    ]
+    lines += textwrap.wrap(random_statement(rng, statements_per_category), WRAP_WIDTH)
+    lines.append("RATER ASSESSMENT")
+    for category in ["EXECUTING THE MISSION", "LEADING PEOPLE", "MANAGING RESOURCES", "IMPROVING THE UNIT"]:
+        lines.append(category)
+        lines += IGNORE_TEXT[category]
+        lines += textwrap.wrap(random_statement(rng, statements_per_category), WRAP_WIDTH)
+    lines += [
+        "RATER NAME, GRADE, AND BRANCH OF SERVICE", f"{rater}, {rng.choice(GRADES)}, USAF",
+        "RATER DUTY TITLE", rng.choice(DUTY_TITLES),
+        "RATER SIGNATURE", f"{rater}, {rng.choice(GRADES)}, {random_date(rng, year)}\\",
+        "RATEE ACKNOWLEDGEMENT", f"{random_name(rng)}, {rng.choice(GRADES)}, {random_date(rng, year)}",
+        "HIGHER LEVEL REVIEWER ASSESSMENT",
+        "STRATIFICATION", f"#{rng.randint(1, 5)} of {rng.randint(6, 40)}",
+        "PROMOTION RECOMMENDATION", rng.choice(["Promote Now", "Must Promote", "Promote"]),
+        "FUTURE ROLES",
+    ]
+    lines += [f"{number}. {role}" for number, role in enumerate(rng.sample(ROLES, 3), 1)]
+    lines += [random_statement(rng, 1) for _ in range(3)]  # parse_pdf keeps the 3 lines before the HLR name
+    lines += [
+        "HIGHER LEVEL REVIEWER NAME, GRADE, AND BRANCH OF SERVICE", f"{hlr}, Lt Col, USAF",
+        "HIGHER LEVEL REVIEWER DUTY TITLE", "Commander",
+        "HIGHER LEVEL REVIEWER SIGNATURE", f"{hlr}, Lt Col, {random_date(rng, year)}",
+    ]
+    return lines
+
+
+def write_epb(path, rng, statements_per_category=3):
+    """Writes one synthetic EPB PDF to path."""
+    lines = epb_lines(rng, statements_per_category)
+    document = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = document.new_page()
+        y = 40
+        for line in lines[start:start + LINES_PER_PAGE]:
+            page.insert_text((30, y), line, fontsize=7)
+            y += 10
+    document.save(path)
+    document.close()
+
+
+def generate_corpus(directory, count, statements_per_category=3, seed=0):
+    """
+    Writes count synthetic EPBs to directory, reusing files that already exist, and returns
+    their paths. The same seed always produces the same documents.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number in range(count):
+        path = os.path.join(directory, f"{LAST_NAMES[number % len(LAST_NAMES)]}{number:05d}-EPB.pdf")
+        if not os.path.exists(path):
+            write_epb(path, random.Random(f"{seed}-{number}-{statements_per_category}"), statements_per_category)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes synthetic EPB PDFs for benchmarking.")
+    parser.add_argument("directory")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--statements", type=int, default=3, help="sentences per category (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    paths = generate_corpus(args.directory, args.count, args.statements, args.seed)
+    print(f"{len(paths)} EPBs in {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark suite for the parser, the output writer and the viewer's table model.
+
+Runs every benchmark at each corpus size (10, 1,000 and 10,000 synthetic EPBs by default, see
+generate_corpus.py) plus the headless startup time, and prints the time per item. --save-baseline writes the results to
+baselines.json; later runs compare against it and exit with status 1 when a benchmark got
+slower than the baseline by more than --tolerance.
+
+    python benchmarks/run_benchmarks.py [--sizes 10 1000] [--save-baseline] [--tolerance 0.25]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pandas as pd
+
+import EPBScraper
+from EPBScraper import CSV_HEADER, IGNORE_TEXT, parse_pdf, remove_unwanted_text, save_to_csv, split_sentences
+from EPBViewer import PandasModel
+from bench_startup import measure_startup
+from generate_corpus import generate_corpus, random_statement
+
+DEFAULT_SIZES = [10, 1000, 10000]
+BASELINE_FILE = os.path.join(BENCH_DIR, "baselines.json")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+
+def measure(function, repeat=3):
+    """Returns the best wall time of repeat calls to function."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_size(size, corpus_dir):
+    """Runs every benchmark against a corpus of size EPBs and returns {name: (seconds, items)}."""
+    paths = generate_corpus(os.path.join(corpus_dir, str(size)), size)
+    repeat = 3 if size <= 1000 else 1
+    results = {}
+
+    records = []
+    def parse_all():
+        records.clear()
+        for path in paths:
+            records.extend(parse_pdf(path))
+    results["parse_pdf"] = (measure(parse_all, repeat), len(paths))
+
+    rng = random.Random(size)
+    statements = [random_statement(rng, 5) for _ in range(size * 5)]
+    results["split_sentences"] = (
+        measure(lambda: [split_sentences("LEADING PEOPLE", statement, "x.pdf", "x") for statement in statements], repeat),
+        len(statements)
+    )
+    unfiltered = [IGNORE_TEXT["LEADING PEOPLE"][0] + "  \n " + statement for statement in statements]
+    results["remove_unwanted_text"] = (
+        measure(lambda: [remove_unwanted_text("LEADING PEOPLE", statement) for statement in unfiltered], repeat),
+        len(unfiltered)
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_csv = os.path.join(directory, "output.csv")
+        results["save_to_csv"] = (measure(lambda: save_to_csv(records, output_csv), repeat), len(records))
+
+    df = pd.DataFrame(records, columns=CSV_HEADER)
+    results["PandasModel"] = (measure(lambda: PandasModel(df), repeat), len(records))
+
+    model = PandasModel(df)
+    cells = [model.index(rng.randrange(len(records)), rng.randrange(len(CSV_HEADER))) for _ in range(10000)]
+    results["PandasModel.data"] = (measure(lambda: [model.data(cell) for cell in cells], repeat), len(cells))
+
+    statement_column = CSV_HEADER.index("Statement")
+    def search():
+        # What the viewer does for one search box query
+        model.setFilter(statement_column, "deploy")
+        model.setFilter(statement_column, "")
+    results["searchItem"] = (measure(search, repeat), len(records))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the names of benchmarks that are slower per item than the baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and result["per_item_us"] > previous["per_item_us"] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks EPBScraper on synthetic EPBs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="corpus sizes (default: %(default)s)")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR, help="where generated PDFs are kept between runs")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results file (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline before failing (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    timings = {}
+    for size in args.sizes:
+        for name, timing in bench_size(size, args.corpus_dir).items():
+            timings[f"{name}@{size}"] = timing
+    timings["headless_startup"] = (measure_startup(), 1)
+
+    results = {}
+    for key, (seconds, items) in timings.items():
+        results[key] = {"seconds": seconds, "items": items, "per_item_us": seconds / max(items, 1) * 1e6}
+        print(f"{key:28} {seconds:10.4f} s  {items:9d} items  {results[key]['per_item_us']:10.2f} us/item")
+
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser_version": EPBScraper.PARSER_VERSION,
+        "results": results,
+    }
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(run, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("Slower than baseline: " + ", ".join(regressions))
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
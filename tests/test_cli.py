@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBScraper import parse_args
+
+
+def test_missing_folder_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse_args([str(tmp_path), str(tmp_path / "typo"), "--headless"])
+    assert exit.value.code == 2
+    assert f"not a folder: {tmp_path / 'typo'}" in capsys.readouterr().err
+
+
+def test_existing_folders_are_accepted(tmp_path):
+    assert parse_args([str(tmp_path), "--headless"]).inputs == [str(tmp_path)]
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBDataset import query_mask, typed_frame
+
+
+def frame():
+    """Three statements: one with every field, one with the same fields different, one with them missing."""
+    return typed_frame(pd.DataFrame({
+        "Category": ["LEADING PEOPLE", "MANAGING RESOURCES", None],
+        "Statement": ["Led 5 Amn.", "Saved $2K.", "Did things."],
+        "period_end": ["1 Jan 24", "30 Sep 25", None],
+        "days_non_rated": ["5", "0", None],
+        "org": ["1st CS", "2nd CS", None],
+    }))
+
+
+def test_missing_values_never_match():
+    df = frame()
+    for query in ["period_end != 1 Jan 24", "Category != LEADING PEOPLE", "org != 1st CS", "days_non_rated != 5"]:
+        assert query_mask(df, query).tolist() == [False, True, False], query
+    for query in ["period_end > 1 Jan 20", "period_end in FY25", "org ~ CS", "days_non_rated >= 0"]:
+        assert not query_mask(df, query)[2], query
+
+
+def test_present_values_still_match():
+    df = frame()
+    assert query_mask(df, "period_end = 1 Jan 24").tolist() == [True, False, False]
+    assert query_mask(df, "category = leading people").tolist() == [True, False, False]
+    assert query_mask(df, "period_end in FY25 AND days_non_rated < 5").tolist() == [False, True, False]
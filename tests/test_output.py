@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBScraper import CSV_HEADER, Interrupted, read_output_records, save_output
+
+
+def record(file_path, statement):
+    return ["LEADING PEOPLE", statement, file_path] + [""] * (len(CSV_HEADER) - 3)
+
+
+def interrupted(records):
+    yield from records
+    raise Interrupted
+
+
+@pytest.mark.parametrize("name", ["output.csv", "output.sqlite"])
+def test_interrupted_write_keeps_previous_output(tmp_path, name):
+    output_file = str(tmp_path / name)
+    previous = [record("a.pdf", "Led 5 Amn."), record("b.pdf", "Saved $2K.")]
+    assert save_output(iter(previous), output_file) == 2
+
+    with pytest.raises(Interrupted):
+        save_output(interrupted([record("c.pdf", "Did things.")]), output_file)
+    assert [list(row) for row in read_output_records(output_file)] == previous
+    assert os.listdir(tmp_path) == [name]
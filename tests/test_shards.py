@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from EPBScraper import (CSV_HEADER, SHARD_FORMAT, SearchIndex, merge_shards, parser_signature, read_output_records,
+                        shard_of)
+
+
+def record(file_path, statement):
+    return ["LEADING PEOPLE", statement, file_path] + [""] * (len(CSV_HEADER) - 3)
+
+
+def write_shards(directory, statements):
+    """Writes the two partial outputs of a corpus with one PDF per statement, as run_shard would."""
+    documents = {1: [], 2: []}
+    for order, statement in enumerate(statements):
+        digest = f"{order + 1:040x}"
+        file_path = statement.rstrip(".").upper() + "-EPB.pdf"
+        documents[shard_of(digest, 2)].append({
+            "order": order, "content_sha1": digest, "file_path": file_path, "sources": [file_path],
+            "size": 1, "mtime_ns": 1, "failure": None, "records": [record(file_path, statement)],
+        })
+    shard_files = []
+    for shard, shard_documents in documents.items():
+        shard_file = str(directory / f"output_shard{shard}of2.jsonl")
+        header = {"format": SHARD_FORMAT, "shard": shard, "shards": 2, "parser": parser_signature("text"),
+                  "extraction": "text", "documents": len(shard_documents), "corpus_documents": len(statements)}
+        with open(shard_file, "w") as f:
+            f.write(json.dumps(header) + "\n")
+            f.writelines(json.dumps(document) + "\n" for document in shard_documents)
+        shard_files.append(shard_file)
+    return shard_files
+
+
+def test_merge_restores_corpus_order(tmp_path):
+    shard_files = write_shards(tmp_path, ["One.", "Two.", "Three.", "Four."])
+    output_file = str(tmp_path / "output.csv")
+    assert merge_shards(shard_files, output_file) == (4, 4, 0)
+    assert [row[1] for row in read_output_records(output_file)] == ["One.", "Two.", "Three.", "Four."]
+
+
+def test_cut_off_shard_changes_nothing(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    index_file = str(tmp_path / "output_index.sqlite")
+    merge_shards(write_shards(tmp_path, ["One.", "Two."]), output_file, index_file)
+    before = {name: (tmp_path / name).read_bytes() for name in ("output.csv", "output_sources.csv")}
+
+    shard_files = write_shards(tmp_path, ["Three.", "Four.", "Five.", "Six."])
+    with open(shard_files[1]) as f:
+        lines = f.readlines()
+    with open(shard_files[1], "w") as f:
+        f.writelines(lines[:-1])
+        f.write(lines[-1][:20])
+    with pytest.raises(ValueError, match="cut off"):
+        merge_shards(shard_files, output_file, index_file)
+
+    assert {name: (tmp_path / name).read_bytes() for name in before} == before
+    assert not os.path.exists(output_file + ".tmp")
+    index = SearchIndex(index_file)
+    try:
+        assert sorted(file_path for file_path, _ in index.search("One OR Two OR Three OR Four OR Five")) == \
+            ["ONE-EPB.pdf", "TWO-EPB.pdf"]
+    finally:
+        index.close()
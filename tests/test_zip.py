@@ -0,0 +1,28 @@
+import os
+import sys
+import random
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from EPBScraper import find_pdfs, parse_pdf
+from generate_corpus import write_epb
+
+
+def test_name_comes_from_the_zip_member(tmp_path):
+    pdf_file = str(tmp_path / "SMITH00010-EPB.pdf")
+    write_epb(pdf_file, random.Random(10))
+    directory = tmp_path / "2024-q1"
+    directory.mkdir()
+    with zipfile.ZipFile(directory / "b.zip", "w") as zip_file:
+        zip_file.write(pdf_file, "SMITH00010-EPB.pdf")
+        zip_file.write(pdf_file, "flight-2/SMITH00010-EPB.pdf")
+
+    sources = find_pdfs([str(directory)])
+    assert [os.path.relpath(source, directory) for source in sources] == \
+        ["b.zip!SMITH00010-EPB.pdf", "b.zip!flight-2/SMITH00010-EPB.pdf"]
+    for source in sources:
+        records = list(parse_pdf(source))
+        assert records
+        assert {record[3] for record in records} == {"SMITH00010"}, source